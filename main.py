@@ -64,8 +64,7 @@ def send_digest():
         if success:
             # Mark articles as sent
             logger.info("6. Marking articles as sent...")
-            for article in unsent_articles:
-                db.mark_article_sent(article["link"], article["title"])
+            db.mark_articles_sent(unsent_articles)
 
             logger.info("Digest sent successfully!")
         else:
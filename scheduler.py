@@ -3,7 +3,6 @@
 import signal
 import sys
 import threading
-import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -24,6 +23,7 @@ class GracefulShutdown:
 
     def __init__(self):
         self.shutdown_requested = False
+        self._event = threading.Event()
         self._original_handlers = {}
         self._logger = get_logger("news_bot.shutdown")
 
@@ -41,11 +41,16 @@ class GracefulShutdown:
         sig_name = signal.Signals(signum).name
         self._logger.info(f"Received {sig_name}, initiating graceful shutdown...")
         self.shutdown_requested = True
+        self._event.set()
 
     def should_shutdown(self) -> bool:
         """Check if shutdown was requested."""
         return self.shutdown_requested
 
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds, waking immediately on shutdown."""
+        return self._event.wait(timeout=timeout)
+
     def cleanup(self):
         """Restore original signal handlers."""
         for sig, handler in self._original_handlers.items():
@@ -66,6 +71,63 @@ def get_shutdown_handler() -> GracefulShutdown:
     return _shutdown_handler
 
 
+def prefetch_post_images(queue, post_ids, post_dicts):
+    """
+    Download OG images for new posts in parallel and store local paths.
+
+    Publishing then only reads a file from disk. Posts whose download
+    failed keep their OG URL, so publishing retries it and falls back to
+    AI generation as before.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from og_parser import download_image_if_large
+
+    logger = get_logger("news_bot.scheduler")
+    jobs = [
+        (post_id, post_dict["image_url"])
+        for post_id, post_dict in zip(post_ids, post_dicts)
+        if (post_dict.get("image_url") or "").startswith(("http://", "https://"))
+    ]
+    if not jobs:
+        return
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        paths = list(executor.map(lambda job: download_image_if_large(job[1]), jobs))
+
+    for (post_id, _), path in zip(jobs, paths):
+        if path:
+            queue.update_image_url(post_id, path)
+
+    logger.info(f"Prefetched {sum(1 for p in paths if p)}/{len(jobs)} OG images")
+
+
+def generate_post_images(queue, post_ids, post_dicts):
+    """
+    Generate AI images for new posts that have no OG image, in one batch.
+
+    Identical prompts share one API request and different ones run in
+    parallel, so publishing only reads a file from disk.
+    """
+    from image_generator import get_image_generator
+
+    logger = get_logger("news_bot.scheduler")
+    jobs = [
+        (post_id, post_dict["image_prompt"])
+        for post_id, post_dict in zip(post_ids, post_dicts)
+        if not post_dict.get("image_url") and post_dict.get("image_prompt")
+    ]
+    if not jobs:
+        return
+
+    paths = get_image_generator().generate_for_posts(jobs)
+    for post_id, path in paths.items():
+        if path:
+            queue.update_image_url(post_id, path)
+
+    logger.info(f"Generated {sum(1 for p in paths.values() if p)}/{len(jobs)} AI images")
+
+
 def generate_daily_posts():
     """Generate posts for the day and add to queue (with moderation support)."""
     from config import get_settings
@@ -113,12 +175,7 @@ def generate_daily_posts():
         unique_articles = []
         duplicates_found = 0
 
-        for article in unsent:
-            result = dedup.check_duplicate(
-                title=article.get("title", ""),
-                url=article.get("link", ""),
-                content=article.get("summary", ""),
-            )
+        for article, result in zip(unsent, dedup.check_duplicates_batch(unsent)):
             if not result.is_duplicate:
                 unique_articles.append(article)
             else:
@@ -199,15 +256,29 @@ def generate_daily_posts():
             post_ids = queue.schedule_posts_for_day(post_dicts, times=times)
             logger.info(f"Scheduled {len(post_ids)} posts for today")
 
+        try:
+            prefetch_post_images(queue, post_ids, post_dicts)
+        except Exception as e:
+            logger.warning(f"Failed to prefetch images: {e}")
+
+        # With moderation, images are generated on approval: rejected posts cost nothing
+        if not settings.use_moderation:
+            try:
+                generate_post_images(queue, post_ids, post_dicts)
+            except Exception as e:
+                logger.warning(f"Failed to generate images: {e}")
+
         # Mark articles as sent
-        for post in posts:
-            db.mark_article_sent(
-                link=post.article_url,
-                title=post.article_title,
-                relevance_score=0,
-                category=post.format.value,
-                status="pending" if settings.use_moderation else "published",
-            )
+        db.mark_articles_sent([
+            {
+                "link": post.article_url,
+                "title": post.article_title,
+                "relevance_score": 0,
+                "category": post.format.value,
+                "status": "pending" if settings.use_moderation else "published",
+            }
+            for post in posts
+        ])
 
         # Log deduplicator stats
         logger.info(f"Deduplicator stats: {dedup.get_stats()}")
@@ -240,7 +311,10 @@ def publish_scheduled_post():
             if all_ready:
                 post = all_ready[0]
         else:
-            # Legacy: publish scheduled posts
+            # Legacy: publish scheduled posts (skip the query when queue is empty)
+            if queue.pending == 0:
+                logger.debug("No posts ready to publish")
+                return
             post = queue.get_next_pending()
 
         if not post:
@@ -329,8 +403,7 @@ def send_digest():
         if sender.channel_id:
             sender.send_to_channel(digest)
 
-        for article in unsent[:20]:
-            db.mark_article_sent(article["link"], article["title"])
+        db.mark_articles_sent(unsent[:20])
 
         logger.info("Digest sent successfully")
 
@@ -338,6 +411,17 @@ def send_digest():
         logger.error(f"Error sending digest: {e}")
 
 
+def cleanup_images():
+    """Remove AI images that have not been used for a while from the image cache."""
+    from image_generator import cleanup_image_cache
+
+    logger = get_logger("news_bot.scheduler")
+    try:
+        cleanup_image_cache()
+    except Exception as e:
+        logger.warning(f"Failed to clean up image cache: {e}")
+
+
 def run_scheduler():
     """Run the scheduler with 1 post per day."""
     load_dotenv()
@@ -352,13 +436,16 @@ def run_scheduler():
     schedule.every().day.at("10:00").do(publish_scheduled_post)
     logger.info("Scheduled post publishing at 10:00")
 
+    # Evict old cached AI images once a day
+    schedule.every().day.at("04:00").do(cleanup_images)
+    logger.info("Scheduled image cache cleanup at 04:00")
+
     while not shutdown.should_shutdown():
         schedule.run_pending()
-        # Check shutdown every 5 seconds
-        for _ in range(12):
-            if shutdown.should_shutdown():
-                break
-            time.sleep(5)
+        # Sleep until the next job is due (max 60s), shutdown wakes us up
+        idle = schedule.idle_seconds()
+        timeout = 60 if idle is None else max(0, min(60, idle))
+        shutdown.wait(timeout)
 
     logger.info("Scheduler stopped gracefully")
 
@@ -9,15 +9,86 @@
 import json
 import re
 import sys
-import time
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
 from urllib.parse import urlparse
 
 import feedparser
 import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 FEEDS_PATH = "config/rss_feeds.json"
 ARTICLES_PER_FEED = 10
 TIMEOUT = 15
+MAX_WORKERS = 16  # parallel HTTP requests (network-bound, threads are fine)
+FEED_WORKERS = 4  # feeds audited at the same time
+PER_HOST_LIMIT = 2  # be polite: max concurrent requests to one host
+RANGE_BYTES = 2048  # enough for JPEG/PNG/WebP headers with dimensions
+HEAD_BYTES = 50000  # og:/twitter: meta tags are in the first 50KB of the page
+HEAD_CHUNK_SIZE = 4096
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; KLYMOBot/1.0)"
+}
+
+
+def _meta_re(attr, value):
+    """<meta> with attr=value and content=..., in either attribute order."""
+    return re.compile(
+        rf'<meta[^>]+{attr}=["\']{value}["\'][^>]+content=["\']([^"\']+)["\']'
+        rf'|<meta[^>]+content=["\']([^"\']+)["\'][^>]+{attr}=["\']{value}["\']',
+        re.IGNORECASE,
+    )
+
+
+_OG_IMAGE_RE = _meta_re("property", "og:image")
+_TWITTER_IMAGE_RE = _meta_re("name", "twitter:image")
+_IMG_SRC_RE = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']')
+
+GENERIC_IMAGE_PATTERNS = [
+    "placeholder", "default", "logo", "favicon", "icon",
+    "blank", "empty", "noimage", "no-image", "missing",
+    "1x1", "pixel", "spacer",
+]
+# One case-insensitive scan instead of a substring check per pattern
+_GENERIC_IMAGE_RE = re.compile(
+    "|".join(map(re.escape, GENERIC_IMAGE_PATTERNS)), re.IGNORECASE
+)
+
+
+def make_session():
+    """Shared session: keep-alive + connection pool for all threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=64,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.3),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+SESSION = make_session()
+
+_host_slots = defaultdict(lambda: threading.Semaphore(PER_HOST_LIMIT))
+_host_slots_lock = threading.Lock()
+
+
+@contextmanager
+def host_slot(url):
+    """Limit concurrent requests per host instead of a global sleep."""
+    host = urlparse(url).netloc.lower()
+    with _host_slots_lock:
+        slot = _host_slots[host]
+    with slot:
+        yield
 
 
 def load_feeds():
@@ -56,48 +127,37 @@ def extract_image_from_rss_entry(entry):
         html = entry.get("summary", "")
 
     if html:
-        match = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', html)
+        match = _IMG_SRC_RE.search(html)
         if match:
             return match.group(1)
 
     return None
 
 
+def _read_head(resp):
+    """Read the streamed page until </head> is seen or HEAD_BYTES is reached."""
+    buf = bytearray()
+    for chunk in resp.iter_content(HEAD_CHUNK_SIZE):
+        start = max(0, len(buf) - len(b"</head>"))
+        buf += chunk
+        if b"</head>" in buf[start:].lower() or len(buf) >= HEAD_BYTES:
+            break
+    return bytes(buf[:HEAD_BYTES]).decode(resp.encoding or "utf-8", errors="replace")
+
+
 def fetch_og_image(url):
-    """Fetch page and extract og:image meta tag."""
+    """Fetch page head and extract og:image meta tag."""
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; KLYMOBot/1.0)"
-        }
-        resp = requests.get(url, headers=headers, timeout=TIMEOUT, allow_redirects=True)
-        resp.raise_for_status()
-        html = resp.text[:50000]  # first 50KB is enough
+        with host_slot(url):
+            # Stream and stop after the head: the rest of the page is never downloaded
+            with SESSION.get(url, timeout=TIMEOUT, allow_redirects=True, stream=True) as resp:
+                resp.raise_for_status()
+                html = _read_head(resp)
 
-        # og:image
-        match = re.search(
-            r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']',
-            html, re.IGNORECASE
-        )
-        if not match:
-            match = re.search(
-                r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+property=["\']og:image["\']',
-                html, re.IGNORECASE
-            )
-        if match:
-            return match.group(1)
-
-        # twitter:image fallback
-        match = re.search(
-            r'<meta[^>]+name=["\']twitter:image["\'][^>]+content=["\']([^"\']+)["\']',
-            html, re.IGNORECASE
-        )
-        if not match:
-            match = re.search(
-                r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+name=["\']twitter:image["\']',
-                html, re.IGNORECASE
-            )
-        if match:
-            return match.group(1)
+        for pattern in (_OG_IMAGE_RE, _TWITTER_IMAGE_RE):
+            match = pattern.search(html)
+            if match:
+                return match.group(1) or match.group(2)
 
     except Exception as e:
         return None
@@ -105,25 +165,57 @@ def fetch_og_image(url):
     return None
 
 
+def _total_size(resp):
+    """Full image size in bytes from Content-Range (206) or Content-Length (200)."""
+    content_range = resp.headers.get("Content-Range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    if resp.status_code == 200:
+        return int(resp.headers.get("Content-Length", 0) or 0)
+    return 0
+
+
+def _image_dimensions(data):
+    """(width, height) from the image header, or (None, None) if not enough bytes."""
+    try:
+        return Image.open(BytesIO(data)).size
+    except Exception:
+        return None, None
+
+
 def check_image_quality(image_url):
-    """HEAD request to check image size and content type."""
+    """Ranged GET of the first bytes: real size plus dimensions from the header.
+
+    HEAD is unreliable on many CDNs (missing or wrong Content-Length).
+    """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; KLYMOBot/1.0)"
-        }
-        resp = requests.head(image_url, headers=headers, timeout=TIMEOUT, allow_redirects=True)
+        with host_slot(image_url):
+            with SESSION.get(
+                image_url,
+                headers={"Range": f"bytes=0-{RANGE_BYTES - 1}"},
+                timeout=TIMEOUT,
+                allow_redirects=True,
+                stream=True,
+            ) as resp:
+                # Servers that ignore Range send the whole file: read only the head
+                head = resp.raw.read(RANGE_BYTES, decode_content=True)
 
         content_type = resp.headers.get("Content-Type", "")
-        content_length = int(resp.headers.get("Content-Length", 0))
+        content_length = _total_size(resp)
 
         is_image = "image" in content_type
         size_kb = content_length / 1024 if content_length else 0
+        width, height = _image_dimensions(head) if is_image else (None, None)
 
         return {
             "url": image_url,
             "is_image": is_image,
             "content_type": content_type,
             "size_kb": round(size_kb, 1),
+            "width": width,
+            "height": height,
             "status": resp.status_code,
         }
     except Exception as e:
@@ -132,6 +224,8 @@ def check_image_quality(image_url):
             "is_image": False,
             "content_type": "error",
             "size_kb": 0,
+            "width": None,
+            "height": None,
             "status": 0,
             "error": str(e),
         }
@@ -139,22 +233,15 @@ def check_image_quality(image_url):
 
 def is_generic_placeholder(url):
     """Heuristic: detect generic/placeholder images."""
-    url_lower = url.lower()
-    generic_patterns = [
-        "placeholder", "default", "logo", "favicon", "icon",
-        "blank", "empty", "noimage", "no-image", "missing",
-        "1x1", "pixel", "spacer",
-    ]
-    for p in generic_patterns:
-        if p in url_lower:
-            return True
+    return _GENERIC_IMAGE_RE.search(url) is not None
 
-    # Very small images are likely placeholders
-    return False
 
+def audit_feed(feed_info, executor, out=print):
+    """Audit a single RSS feed for OG image quality.
 
-def audit_feed(feed_info):
-    """Audit a single RSS feed for OG image quality."""
+    Page and image requests for all entries run in parallel on `executor`;
+    report lines go to `out` so concurrent feeds don't interleave output.
+    """
     name = feed_info["name"]
     url = feed_info["url"]
     enabled = feed_info.get("enabled", True)
@@ -162,22 +249,26 @@ def audit_feed(feed_info):
     if not enabled:
         return {"name": name, "status": "disabled", "articles": 0}
 
-    print(f"\n{'='*60}")
-    print(f"📡 {name}")
-    print(f"   {url}")
+    out(f"\n{'='*60}")
+    out(f"📡 {name}")
+    out(f"   {url}")
 
     try:
-        feed = feedparser.parse(url)
+        # Download through the shared session (feedparser.parse(url) uses urllib)
+        with host_slot(url):
+            resp = SESSION.get(url, timeout=TIMEOUT)
+        resp.raise_for_status()
+        feed = feedparser.parse(resp.content)
         entries = feed.entries[:ARTICLES_PER_FEED]
     except Exception as e:
-        print(f"   ❌ Feed parse error: {e}")
+        out(f"   ❌ Feed parse error: {e}")
         return {"name": name, "status": "feed_error", "articles": 0}
 
     if not entries:
-        print(f"   ❌ No entries found")
+        out(f"   ❌ No entries found")
         return {"name": name, "status": "empty", "articles": 0}
 
-    print(f"   📰 Статей: {len(entries)}")
+    out(f"   📰 Статей: {len(entries)}")
 
     results = {
         "name": name,
@@ -191,36 +282,46 @@ def audit_feed(feed_info):
         "samples": [],
     }
 
-    sizes = []
+    # Step 1: RSS images (no network)
+    items = [
+        (entry.get("title", "???")[:60], entry.get("link", ""), extract_image_from_rss_entry(entry))
+        for entry in entries
+    ]
 
-    for i, entry in enumerate(entries):
-        title = entry.get("title", "???")[:60]
-        link = entry.get("link", "")
+    # Step 2: fetch OG images from pages (only first 5 to save time)
+    og_futures = {
+        i: executor.submit(fetch_og_image, link)
+        for i, (_, link, _) in enumerate(items)
+        if i < 5 and link
+    }
+    og_images = {i: future.result() for i, future in og_futures.items()}
 
-        # Step 1: check RSS image
-        rss_img = extract_image_from_rss_entry(entry)
-        og_img = None
-        final_img = None
+    final_images = [rss_img or og_images.get(i) for i, (_, _, rss_img) in enumerate(items)]
+
+    # Step 3: check image quality
+    quality_futures = {
+        i: executor.submit(check_image_quality, img)
+        for i, img in enumerate(final_images)
+        if img and not is_generic_placeholder(img)
+    }
+    qualities = {i: future.result() for i, future in quality_futures.items()}
+
+    sizes = []
+
+    for i, (title, link, rss_img) in enumerate(items):
+        og_img = og_images.get(i)
+        final_img = final_images[i]
 
         if rss_img:
             results["has_rss_image"] += 1
-            final_img = rss_img
-
-        # Step 2: fetch OG image from page (only first 5 to save time)
-        if i < 5 and link:
-            og_img = fetch_og_image(link)
-            if og_img:
-                results["has_og_image"] += 1
-                if not final_img:
-                    final_img = og_img
-            time.sleep(0.3)  # be polite
+        if og_img:
+            results["has_og_image"] += 1
 
         if final_img:
             results["has_any_image"] += 1
 
-            # Step 3: check image quality
-            if not is_generic_placeholder(final_img):
-                quality = check_image_quality(final_img)
+            quality = qualities.get(i)
+            if quality:
                 if quality["size_kb"] > 0:
                     sizes.append(quality["size_kb"])
                 if quality["size_kb"] > 50:
@@ -231,6 +332,8 @@ def audit_feed(feed_info):
                         "title": title,
                         "image_url": final_img[:120],
                         "size_kb": quality["size_kb"],
+                        "width": quality["width"],
+                        "height": quality["height"],
                         "source": "rss" if rss_img else "og",
                     })
 
@@ -239,7 +342,7 @@ def audit_feed(feed_info):
         size_info = ""
         if final_img and sizes:
             size_info = f" [{sizes[-1]}KB]" if sizes[-1] > 0 else ""
-        print(f"   {status} {title} {src}{size_info}")
+        out(f"   {status} {title} {src}{size_info}")
 
     results["avg_size_kb"] = round(sum(sizes) / len(sizes), 1) if sizes else 0
     results["image_rate"] = round(results["has_any_image"] / len(entries) * 100)
@@ -254,9 +357,17 @@ def main():
 
     all_results = []
 
-    for feed_info in feeds:
-        result = audit_feed(feed_info)
-        all_results.append(result)
+    def run(feed_info):
+        lines = []
+        return audit_feed(feed_info, executor, out=lines.append), lines
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor, \
+            ThreadPoolExecutor(max_workers=FEED_WORKERS) as feed_executor:
+        # map() keeps feed order, so the report reads the same as before
+        for result, lines in feed_executor.map(run, feeds):
+            if lines:
+                print("\n".join(lines))
+            all_results.append(result)
 
     # Summary report
     print("\n" + "=" * 70)
@@ -289,7 +400,8 @@ def main():
         if r.get("samples"):
             print(f"\n📡 {r['name']}:")
             for s in r["samples"]:
-                print(f"   [{s['size_kb']}KB] {s['title']}")
+                dims = f" {s['width']}x{s['height']}" if s.get("width") else ""
+                print(f"   [{s['size_kb']}KB{dims}] {s['title']}")
                 print(f"   → {s['image_url']}")
 
     # Recommendations
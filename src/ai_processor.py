@@ -1,8 +1,10 @@
 """AI processor using Claude API for news summarization and translation."""
 
 import os
+import re
+import sqlite3
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
 
 from anthropic import (
     Anthropic,
@@ -21,11 +23,80 @@ from logger import get_logger
 
 logger = get_logger("news_bot.ai")
 
+_P_TAG = re.compile(r"</?p\b[^>]*>")
+
+# Article descriptions in the digest prompt share one budget (~1k tokens at
+# ~4 chars per token): up to 13 articles get 300 chars each, a full
+# 20-article digest gets 200, so input size stays bounded
+SUMMARY_BUDGET_CHARS = 4000
+SUMMARY_MAX_CHARS = 300
+SUMMARY_MIN_CHARS = 80
+
+# Digest instructions are identical on every call, so they go into the
+# system prompt marked for Anthropic prompt caching (see DIGEST_SYSTEM).
+DIGEST_INSTRUCTIONS = """Ты - AI-ассистент, который помогает предпринимателю быть в курсе всех трендов и событий в области искусственного интеллекта.
+
+Ниже — список статей о AI за последние 24 часа.
+
+Твоя задача:
+1. Проанализируй ВСЕ эти статьи
+2. Выбери 8-12 самых важных новостей для формирования ПОЛНОЙ КАРТИНЫ происходящего в AI
+
+ПРИОРИТЕТЫ (распредели примерно 70/30):
+
+🎯 <b>70% - ПРАКТИКА И БИЗНЕС</b> (топ-приоритет):
+- Новые AI-инструменты, продукты, API (что можно использовать прямо сейчас)
+- Инвестиции в AI-стартапы и успешные кейсы
+- Бизнес-применения AI (что можно внедрить и монетизировать)
+- Технологические прорывы с практической ценностью
+- Тренды, которые влияют на бизнес
+
+📰 <b>30% - КОНТЕКСТ И ПОВЕСТКА</b> (чтобы быть в теме):
+- Регулирование AI (новые законы, ограничения, политика)
+- Важные академические исследования (если меняют индустрию)
+- Этика и безопасность AI (крупные дискуссии и события)
+- Макротренды и стратегические прогнозы
+
+3. Для каждой новости создай краткую выжимку (2-3 предложения) на русском
+4. Переведи заголовок на русский
+5. Добавь соответствующую иконку в начале (🚀💰💡🏛️🔬⚖️ и т.д.)
+6. Укажи HTML-ссылку на оригинал
+
+ФОРМАТ ОТВЕТА (HTML-разметка для Telegram):
+
+🚀 <b>[Заголовок на русском]</b>
+[Краткое описание - почему это важно, что это значит для бизнеса/индустрии]
+👉 <a href="[URL статьи]">Читать</a>
+
+---
+
+ВАЖНО О ФОРМАТИРОВАНИИ:
+- Используй HTML-разметку: <b>жирный</b>, <a href="URL">ссылка</a>
+- НИКОГДА не пиши голые URL — только <a href="URL">Читать</a>
+- НЕ используй Markdown (**жирный** или [текст](url))
+
+ВАЖНО О КОНТЕНТЕ:
+- Пиши живым понятным языком
+- Фокусируйся на том, ЧТО можно сделать с этой информацией
+- НЕ упускай важные политические/регулятивные новости - они влияют на бизнес
+- Убери только откровенно рекламные статьи и дубликаты
+- Давай ПОЛНУЮ картину дня в AI-индустрии"""
+
+DIGEST_ARTICLES_PREFIX = "Вот список статей о AI за последние 24 часа:\n"
+
+DIGEST_SYSTEM = [
+    {
+        "type": "text",
+        "text": DIGEST_INSTRUCTIONS,
+        "cache_control": {"type": "ephemeral"},
+    },
+]
+
 
 class AIProcessor:
     """Process news articles using Claude AI."""
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, use_cache: bool = True):
         """Initialize Claude AI client."""
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
@@ -34,6 +105,12 @@ class AIProcessor:
         self.client = Anthropic(api_key=self.api_key)
         self.model = "claude-sonnet-4-20250514"
 
+        # Reuse digests for (almost) the same article set, e.g. manual re-runs
+        self.cache = None
+        if use_cache:
+            from llm_cache import get_llm_cache
+            self.cache = get_llm_cache()
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=2, min=4, max=60),
@@ -45,22 +122,30 @@ class AIProcessor:
             f"{retry_state.outcome.exception()}"
         ),
     )
-    def _call_claude_api(self, prompt: str, max_tokens: int = 4000) -> str:
+    def _call_claude_api(
+        self,
+        prompt: Union[str, List[Dict]],
+        max_tokens: int = 4000,
+        system: Optional[Union[str, List[Dict]]] = None,
+    ) -> str:
         """
         Call Claude API with retry logic.
 
         Args:
-            prompt: The prompt to send
+            prompt: The prompt to send (plain text or list of content blocks)
             max_tokens: Maximum tokens in response
+            system: Optional system prompt (text or content blocks)
 
         Returns:
             The response text from Claude
         """
+        kwargs = {"system": system} if system else {}
         message = self.client.messages.create(
             model=self.model,
             max_tokens=max_tokens,
             temperature=0.7,
             messages=[{"role": "user", "content": prompt}],
+            **kwargs,
         )
         return message.content[0].text
 
@@ -78,67 +163,24 @@ class AIProcessor:
         if not articles:
             return "Нет новых статей за указанный период."
 
-        # Prepare articles text
-        articles_text = self._format_articles_for_prompt(articles[:max_articles])
-
-        # Create prompt
-        prompt = f"""Ты - AI-ассистент, который помогает предпринимателю быть в курсе всех трендов и событий в области искусственного интеллекта.
-
-Вот список статей о AI за последние 24 часа:
-
-{articles_text}
-
-Твоя задача:
-1. Проанализируй ВСЕ эти статьи
-2. Выбери 8-12 самых важных новостей для формирования ПОЛНОЙ КАРТИНЫ происходящего в AI
-
-ПРИОРИТЕТЫ (распредели примерно 70/30):
-
-🎯 <b>70% - ПРАКТИКА И БИЗНЕС</b> (топ-приоритет):
-- Новые AI-инструменты, продукты, API (что можно использовать прямо сейчас)
-- Инвестиции в AI-стартапы и успешные кейсы
-- Бизнес-применения AI (что можно внедрить и монетизировать)
-- Технологические прорывы с практической ценностью
-- Тренды, которые влияют на бизнес
-
-📰 <b>30% - КОНТЕКСТ И ПОВЕСТКА</b> (чтобы быть в теме):
-- Регулирование AI (новые законы, ограничения, политика)
-- Важные академические исследования (если меняют индустрию)
-- Этика и безопасность AI (крупные дискуссии и события)
-- Макротренды и стратегические прогнозы
-
-3. Для каждой новости создай краткую выжимку (2-3 предложения) на русском
-4. Переведи заголовок на русский
-5. Добавь соответствующую иконку в начале (🚀💰💡🏛️🔬⚖️ и т.д.)
-6. Укажи HTML-ссылку на оригинал
-
-ФОРМАТ ОТВЕТА (HTML-разметка для Telegram):
+        articles = articles[:max_articles]
+        date_str = datetime.now().strftime("%d.%m.%Y")
+        header = f"🤖 <b>AI News Digest - {date_str}</b>\n\n"
 
-🚀 <b>[Заголовок на русском]</b>
-[Краткое описание - почему это важно, что это значит для бизнеса/индустрии]
-👉 <a href="[URL статьи]">Читать</a>
+        prompt = self._build_digest_prompt(articles)
 
----
-
-ВАЖНО О ФОРМАТИРОВАНИИ:
-- Используй HTML-разметку: <b>жирный</b>, <a href="URL">ссылка</a>
-- НИКОГДА не пиши голые URL — только <a href="URL">Читать</a>
-- НЕ используй Markdown (**жирный** или [текст](url))
-
-ВАЖНО О КОНТЕНТЕ:
-- Пиши живым понятным языком
-- Фокусируйся на том, ЧТО можно сделать с этой информацией
-- НЕ упускай важные политические/регулятивные новости - они влияют на бизнес
-- Убери только откровенно рекламные статьи и дубликаты
-- Давай ПОЛНУЮ картину дня в AI-индустрии"""
+        if self.cache:
+            prompt_hash = self.cache.prompt_hash(self.model, prompt, DIGEST_SYSTEM)
+            cached = self._cache_lookup(prompt_hash, articles)
+            if cached:
+                return header + cached
 
         try:
-            logger.info(f"Creating digest from {len(articles[:max_articles])} articles")
-            digest = self._call_claude_api(prompt)
+            logger.info(f"Creating digest from {len(articles)} articles")
+            digest = self._call_claude_api(prompt, system=DIGEST_SYSTEM)
 
-            # Add header
-            date_str = datetime.now().strftime("%d.%m.%Y")
-            header = f"🤖 <b>AI News Digest - {date_str}</b>\n\n"
+            if self.cache:
+                self._cache_save(prompt_hash, articles, digest)
 
             logger.info("Digest created successfully")
             return header + digest
@@ -147,20 +189,51 @@ class AIProcessor:
             logger.error(f"Error calling Claude API: {e}")
             return f"Ошибка при создании дайджеста: {e}"
 
-    def _format_articles_for_prompt(self, articles: List[Dict]) -> str:
-        """Format articles for Claude prompt."""
-        formatted = []
-        for i, article in enumerate(articles, 1):
-            text = f"{i}. **{article['title']}**\n"
-            text += f"   Источник: {article['source']}\n"
-            if article.get("summary"):
-                # Clean HTML from summary
-                summary = article["summary"].replace("<p>", "").replace("</p>", "")
-                text += f"   Описание: {summary[:300]}...\n"
-            text += f"   Ссылка: {article['link']}\n"
-            formatted.append(text)
-
-        return "\n".join(formatted)
+    def _cache_lookup(self, prompt_hash: str, articles: List[Dict]) -> Optional[str]:
+        """Cached digest for the prompt or a similar article set; None on cache errors."""
+        try:
+            return self.cache.get(prompt_hash) or self.cache.find_similar("digest", articles)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache lookup failed, calling API: {e}")
+            return None
+
+    def _cache_save(self, prompt_hash: str, articles: List[Dict], digest: str):
+        """Store a fresh digest; cache errors are logged, the digest is still returned."""
+        try:
+            self.cache.put(prompt_hash, digest)
+            self.cache.store("digest", articles, digest)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _build_digest_prompt(self, articles: List[Dict]) -> str:
+        """User message for a digest; the static instructions live in DIGEST_SYSTEM."""
+        # Single join: prefix and article entries are concatenated once
+        return "\n".join((DIGEST_ARTICLES_PREFIX, *self._format_articles_for_prompt(articles)))
+
+    def _format_articles_for_prompt(self, articles: List[Dict]) -> List[str]:
+        """Format articles for Claude prompt, one entry per article."""
+        limit = self._summary_limit(len(articles))
+        return [self._format_article(i, article, limit) for i, article in enumerate(articles, 1)]
+
+    @staticmethod
+    def _summary_limit(count: int) -> int:
+        """Per-article description length in chars for a prompt with `count` articles."""
+        if count <= 0:
+            return SUMMARY_MAX_CHARS
+        return max(SUMMARY_MIN_CHARS, min(SUMMARY_MAX_CHARS, SUMMARY_BUDGET_CHARS // count))
+
+    @staticmethod
+    def _format_article(i: int, article: Dict, summary_limit: int = SUMMARY_MAX_CHARS) -> str:
+        """Format one numbered article entry."""
+        summary = article.get("summary")
+        # Clean <p> tags from summary
+        description = f"   Описание: {_P_TAG.sub('', summary)[:summary_limit]}...\n" if summary else ""
+        return (
+            f"{i}. **{article['title']}**\n"
+            f"   Источник: {article['source']}\n"
+            f"{description}"
+            f"   Ссылка: {article['link']}\n"
+        )
 
 
 if __name__ == "__main__":
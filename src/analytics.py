@@ -1,7 +1,14 @@
 """Analytics module for tracking post performance."""
 
-import random
+import copy
+import functools
+import hashlib
+import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -10,6 +17,187 @@ from logger import get_logger
 
 logger = get_logger("news_bot.analytics")
 
+# Bind datetimes directly as "YYYY-MM-DD HH:MM:SS[.ffffff]", the format
+# SQLite's own date functions produce, so range comparisons line up
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=" "))
+
+# Engagement counters that can be updated in post_stats
+STATS_COLUMNS = ("views", "forwards", "reactions", "comments", "clicks")
+
+# Per-group fields returned by get_ab_comparison
+_AB_KEYS = (
+    "posts", "total_views", "total_forwards", "total_reactions",
+    "avg_views", "avg_forwards", "avg_reactions", "avg_err",
+)
+
+# Bump when migrate() gains new tables, columns or indexes
+SCHEMA_VERSION = 1
+
+# Metrics get_top_posts can sort by
+TOP_POST_SORTS = ("views", "forwards", "reactions", "comments")
+
+# One prepared UPDATE/SELECT per lookup key, so the sqlite3 statement
+# cache reuses them; COALESCE keeps metrics passed as None
+_UPDATE_STATS_SQL = {
+    key: (
+        "UPDATE post_stats SET "
+        + ", ".join(f"{c} = COALESCE(?, {c})" for c in STATS_COLUMNS)
+        + f", updated_at = ? WHERE {key} = ?"
+    )
+    for key in ("post_id", "message_id")
+}
+# Engagement Rate by Reach computed by SQLite:
+# ERR = (reactions + comments + forwards) / views * 100;
+# {p} is the table prefix (e.g. "ps.")
+ERR_SQL = (
+    "CASE WHEN {p}views > 0 THEN ROUND((COALESCE({p}reactions, 0) + COALESCE({p}comments, 0)"
+    " + COALESCE({p}forwards, 0)) * 100.0 / {p}views, 2) ELSE 0.0 END"
+)
+
+_SELECT_STATS_SQL = {
+    key: f"SELECT *, {ERR_SQL.format(p='')} AS err FROM post_stats WHERE {key} = ?"
+    for key in ("post_id", "message_id")
+}
+
+# Recompute one daily_metrics row from post_stats (bound: date, updated_at,
+# date again). Searches idx_ps_published_date; subscribers is left as is.
+_ROLLUP_SQL = """
+    INSERT INTO daily_metrics
+    (date, posts_published, total_views, total_forwards, total_reactions,
+     total_comments, avg_err, updated_at)
+    SELECT
+        ?,
+        COUNT(*),
+        COALESCE(SUM(views), 0),
+        COALESCE(SUM(forwards), 0),
+        COALESCE(SUM(reactions), 0),
+        COALESCE(SUM(comments), 0),
+        COALESCE(ROUND((COALESCE(SUM(forwards), 0) + COALESCE(SUM(reactions), 0))
+                       * 100.0 / NULLIF(SUM(views), 0), 2), 0),
+        ?
+    FROM post_stats
+    WHERE published_date = ?
+    ON CONFLICT(date) DO UPDATE SET
+        posts_published = excluded.posts_published,
+        total_views = excluded.total_views,
+        total_forwards = excluded.total_forwards,
+        total_reactions = excluded.total_reactions,
+        total_comments = excluded.total_comments,
+        avg_err = excluded.avg_err,
+        updated_at = excluded.updated_at
+"""
+
+# Read aggregations are memoized this long (seconds); any write invalidates
+STATS_CACHE_TTL = 60
+
+# Static parts of the Telegram report messages
+_AB_HEADER_TMPL = "🔬 <b>A/B тест за {days} дней</b>\n"
+_AB_GROUP_TMPL = (
+    "<b>Группа {name}:</b>\n"
+    "  📝 Постов: {posts}\n"
+    "  👁 Avg views: {avg_views:.0f}\n"
+    "  📈 Avg ERR: {avg_err}%\n"
+)
+_AB_WINNER_TMPL = "🏆 Лидер: группа <b>{winner}</b> (+{err_difference}% ERR)"
+_AB_TIE = "🤝 Результаты одинаковые"
+
+_STATS_HEADER_TMPL = (
+    "📊 <b>Аналитика за {days} дней</b>\n"
+    "\n"
+    "📝 Постов: {total_posts}\n"
+    "👁 Просмотров: {total_views:,}\n"
+    "🔄 Репостов: {total_forwards}\n"
+    "❤️ Реакций: {total_reactions}\n"
+    "\n"
+    "📈 Средний ERR: {avg_err}%\n"
+    "👁 Среднее просмотров/пост: {avg_views_per_post:.0f}"
+)
+_STATS_GROWTH_TMPL = (
+    "\n"
+    "👥 Подписчиков: {end_subscribers:,}\n"
+    "📈 Рост: +{growth} ({growth_percent}%)"
+)
+
+
+def _cutoff(days: int) -> datetime:
+    """
+    Start of a "last N days" window.
+
+    Computed once in Python and bound as a plain value, so the
+    published_at range is a constant for the index range scan. Local time,
+    same clock as the stored published_at values.
+    """
+    return datetime.now() - timedelta(days=days)
+
+
+def _ttl_cached(method):
+    """
+    Memoize an Analytics read method per arguments.
+
+    Entries expire after STATS_CACHE_TTL or when a write transaction
+    commits (the instance's generation counter changes). Callers get a
+    deep copy, so mutating a returned dict/list can't corrupt the cache.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            hit = self._stats_cache.get(key)
+        if hit and hit[0] == generation and now - hit[1] < STATS_CACHE_TTL:
+            return copy.deepcopy(hit[2])
+
+        value = method(self, *args, **kwargs)
+        with self._lock:
+            self._stats_cache[key] = (generation, now, value)
+        return copy.deepcopy(value)
+
+    return wrapper
+
+
+class _ReadPool:
+    """
+    Read-only connections for concurrent queries.
+
+    Under WAL readers don't block each other or the writer, so report
+    queries can run while a publication is being recorded. Connections
+    are opened lazily, at most `size` are checked out at once.
+    """
+
+    def __init__(self, db_path: Path, size: int):
+        self._uri = f"{db_path.resolve().as_uri()}?mode=ro"
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection, return it to the pool afterwards."""
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+
+    def close(self):
+        """Close idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
 
 class Analytics:
     """Track and analyze post performance metrics."""
@@ -18,11 +206,75 @@ class Analytics:
         """Initialize analytics module."""
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Single writer connection shared by the bot and scheduler threads,
+        # serialized by a lock; autocommit, transactions are explicit
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        # ~20 MB page cache; it lives as long as the connection now
+        self._conn.execute("PRAGMA cache_size=-20000")
+        self._lock = threading.RLock()
+
+        # Memoized aggregations, see _ttl_cached
+        self._stats_cache: Dict[tuple, tuple] = {}
+        self._generation = 0
+
         self._init_tables()
 
+        # Readers are separate connections, see _reader
+        self._read_pool = _ReadPool(self.db_path, min(8, os.cpu_count() or 1))
+
+    def close(self):
+        """Close the database connections."""
+        self._read_pool.close()
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Run statements in one write transaction (BEGIN IMMEDIATE ... COMMIT)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._generation += 1
+
+    @contextmanager
+    def _reader(self):
+        """Pooled read-only connection for queries (rows are sqlite3.Row)."""
+        with self._read_pool.connection() as conn:
+            yield conn
+
     def _init_tables(self):
-        """Create analytics tables if not exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        """Bring the schema up to date, then refresh planner statistics."""
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        # Healthy start: schema is current, no write lock needed
+        if version < SCHEMA_VERSION:
+            self.migrate()
+
+        # Refresh planner statistics when they are stale (cheap when they aren't)
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+        logger.info("Analytics tables initialized")
+
+    def migrate(self):
+        """
+        Create analytics tables and indexes, apply column migrations.
+
+        Idempotent; stamps PRAGMA user_version = SCHEMA_VERSION when done.
+        """
+        with self._transaction() as conn:
             # Post stats table - metrics per post
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS post_stats (
@@ -41,19 +293,46 @@ class Analytics:
                     UNIQUE(post_id)
                 )
             """)
-            # Migration: add ab_group column if not exists
-            try:
+            # Migration: add ab_group column to tables created before it existed
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(post_stats)")}
+            if "ab_group" not in columns:
                 conn.execute("ALTER TABLE post_stats ADD COLUMN ab_group TEXT DEFAULT 'A'")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_post_stats_message
-                ON post_stats(message_id)
-            """)
+            # Telegram message IDs are unique in the channel: a unique index
+            # lets update-by-message_id stop after one probe
+            try:
+                conn.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_post_stats_message_uniq
+                    ON post_stats(message_id) WHERE message_id IS NOT NULL
+                """)
+                conn.execute("DROP INDEX IF EXISTS idx_post_stats_message")
+            except sqlite3.IntegrityError:
+                logger.warning("Duplicate message_id in post_stats, keeping non-unique index")
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_post_stats_message
+                    ON post_stats(message_id)
+                """)
+            # No index holds a counter: each would be rewritten on every stats
+            # update. get_top_posts, get_ab_comparison and the daily rollup
+            # filter on publication columns, which stats updates never touch,
+            # and read the period's rows (one post a day).
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_post_stats_published
                 ON post_stats(published_at)
             """)
+            # Calendar day of publication, for per-day rollups without
+            # wrapping published_at in date() (which can't use an index)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_xinfo(post_stats)")}
+            if "published_date" not in columns:
+                conn.execute(
+                    "ALTER TABLE post_stats ADD COLUMN published_date TEXT"
+                    " GENERATED ALWAYS AS (substr(published_at, 1, 10)) VIRTUAL"
+                )
+            # _ROLLUP_SQL: one day's rows. Counters after the generated
+            # column wouldn't make it covering, SQLite still reads the row.
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ps_published_date
+                ON post_stats(published_date)
+            """)
 
             # Daily metrics table - aggregated daily stats
             conn.execute("""
@@ -73,9 +352,32 @@ class Analytics:
                 CREATE INDEX IF NOT EXISTS idx_daily_metrics_date
                 ON daily_metrics(date)
             """)
+            # Migration: daily_metrics became a rollup of post_stats
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(daily_metrics)")}
+            if "total_comments" not in columns:
+                conn.execute("ALTER TABLE daily_metrics ADD COLUMN total_comments INTEGER DEFAULT 0")
+            self._refresh_daily_rollup(conn, [
+                row[0] for row in conn.execute(
+                    "SELECT DISTINCT published_date FROM post_stats"
+                    " WHERE published_date IS NOT NULL"
+                )
+            ])
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        logger.info(f"Analytics schema migrated to version {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _refresh_daily_rollup(conn: sqlite3.Connection, dates, now: Optional[datetime] = None):
+        """
+        Recompute daily_metrics rows for the given dates (YYYY-MM-DD).
 
-            conn.commit()
-            logger.info("Analytics tables initialized")
+        Called inside the write transaction that changed post_stats, so the
+        rollup never lags behind; only the touched days are rescanned.
+        `now` is the caller's timestamp for the batch, taken once.
+        """
+        now = now or datetime.now()
+        params = [(date, now, date) for date in set(dates) if date]
+        if params:
+            conn.executemany(_ROLLUP_SQL, params)
 
     def record_publication(
         self,
@@ -98,30 +400,49 @@ class Analytics:
         Returns:
             True if recorded successfully
         """
+        now = datetime.now()
         if published_at is None:
-            published_at = datetime.now()
+            published_at = now
 
-        # Auto-assign A/B group (50/50 split)
+        # Auto-assign A/B group (50/50 split), stable per post_id so a
+        # re-recorded publication stays in the same group
         if ab_group is None:
-            ab_group = random.choice(["A", "B"])
+            ab_group = self.ab_group_for(post_id)
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
+                # A re-recorded post may move to another day: refresh both
+                dates = [published_at.strftime("%Y-%m-%d")]
+                dates.extend(row[0] for row in conn.execute(
+                    "SELECT published_date FROM post_stats WHERE post_id = ?",
+                    (post_id,),
+                ))
                 conn.execute(
                     """
-                    INSERT OR REPLACE INTO post_stats
+                    INSERT INTO post_stats
                     (post_id, message_id, channel_id, ab_group, published_at, updated_at)
                     VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(post_id) DO UPDATE SET
+                        message_id = excluded.message_id,
+                        channel_id = excluded.channel_id,
+                        ab_group = excluded.ab_group,
+                        published_at = excluded.published_at,
+                        updated_at = excluded.updated_at
                     """,
-                    (post_id, message_id, channel_id, ab_group, published_at.isoformat(), datetime.now().isoformat()),
+                    (post_id, message_id, channel_id, ab_group, published_at, now),
                 )
-                conn.commit()
+                self._refresh_daily_rollup(conn, dates, now)
                 logger.info(f"Recorded publication: post_id={post_id}, message_id={message_id}, ab_group={ab_group}")
                 return True
         except Exception as e:
             logger.error(f"Error recording publication: {e}")
             return False
 
+    @staticmethod
+    def ab_group_for(post_id: int) -> str:
+        """Deterministic A/B bucket for a post."""
+        return "AB"[hashlib.blake2b(str(post_id).encode(), digest_size=1).digest()[0] & 1]
+
     def update_post_stats(
         self,
         post_id: int = None,
@@ -151,89 +472,89 @@ class Analytics:
             logger.error("Either post_id or message_id required")
             return False
 
-        updates = []
-        values = []
-
-        if views is not None:
-            updates.append("views = ?")
-            values.append(views)
-        if forwards is not None:
-            updates.append("forwards = ?")
-            values.append(forwards)
-        if reactions is not None:
-            updates.append("reactions = ?")
-            values.append(reactions)
-        if comments is not None:
-            updates.append("comments = ?")
-            values.append(comments)
-        if clicks is not None:
-            updates.append("clicks = ?")
-            values.append(clicks)
-
-        if not updates:
-            return False
-
-        updates.append("updated_at = ?")
-        values.append(datetime.now().isoformat())
-
-        if post_id:
-            where = "post_id = ?"
-            values.append(post_id)
-        else:
-            where = "message_id = ?"
-            values.append(message_id)
-
+        row = {
+            "post_id": post_id,
+            "message_id": message_id,
+            "views": views,
+            "forwards": forwards,
+            "reactions": reactions,
+            "comments": comments,
+            "clicks": clicks,
+        }
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    f"UPDATE post_stats SET {', '.join(updates)} WHERE {where}",
-                    values,
-                )
-                conn.commit()
-                logger.info(f"Updated stats: post_id={post_id}, message_id={message_id}")
-                return True
+            if not self.update_post_stats_bulk([row]):
+                return False
+            logger.info(f"Updated stats: post_id={post_id}, message_id={message_id}")
+            return True
         except Exception as e:
             logger.error(f"Error updating stats: {e}")
             return False
 
+    def update_post_stats_bulk(self, rows: List[Dict]) -> int:
+        """
+        Update stats for many posts in one transaction.
+
+        Every row goes through one of two fixed statements (by post_id or
+        by message_id) where None keeps the current value, so SQLite reuses
+        the prepared statement and N posts cost one executemany and one commit.
+
+        Args:
+            rows: Dicts with 'post_id' or 'message_id' plus any of
+                views/forwards/reactions/comments/clicks (None = keep)
+
+        Returns:
+            Number of rows submitted for update
+        """
+        now = datetime.now()
+        groups: Dict[str, List[list]] = {}
+
+        for row in rows:
+            if row.get("post_id"):
+                key = "post_id"
+            elif row.get("message_id"):
+                key = "message_id"
+            else:
+                logger.warning("Skipping stats row without post_id/message_id")
+                continue
+
+            values = [row.get(c) for c in STATS_COLUMNS]
+            if all(v is None for v in values):
+                continue
+            groups.setdefault(key, []).append(values + [now, row[key]])
+
+        if not groups:
+            return 0
+
+        with self._transaction() as conn:
+            dates = set()
+            for key, values in groups.items():
+                conn.executemany(_UPDATE_STATS_SQL[key], values)
+                # Days whose rollup rows are affected
+                for start in range(0, len(values), 500):
+                    ids = [v[-1] for v in values[start:start + 500]]
+                    dates.update(row[0] for row in conn.execute(
+                        f"SELECT DISTINCT published_date FROM post_stats"
+                        f" WHERE {key} IN ({','.join('?' * len(ids))})",
+                        ids,
+                    ))
+            self._refresh_daily_rollup(conn, dates, now)
+
+        count = sum(len(values) for values in groups.values())
+        logger.debug(f"Updated stats for {count} posts")
+        return count
+
     def get_post_stats(self, post_id: int = None, message_id: int = None) -> Optional[Dict]:
         """Get stats for a specific post."""
         if not post_id and not message_id:
             return None
 
-        where = "post_id = ?" if post_id else "message_id = ?"
-        value = post_id if post_id else message_id
-
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                f"SELECT * FROM post_stats WHERE {where}",
-                (value,),
-            )
-            row = cursor.fetchone()
-            if row:
-                stats = dict(row)
-                stats["err"] = self._calculate_err(stats)
-                return stats
-            return None
-
-    def _calculate_err(self, stats: Dict) -> float:
-        """
-        Calculate Engagement Rate by Reach (ERR).
+        key, value = ("post_id", post_id) if post_id else ("message_id", message_id)
 
-        ERR = (reactions + comments + forwards) / views * 100
-        """
-        views = stats.get("views", 0)
-        if views == 0:
-            return 0.0
-
-        engagement = (
-            stats.get("reactions", 0) +
-            stats.get("comments", 0) +
-            stats.get("forwards", 0)
-        )
-        return round(engagement / views * 100, 2)
+        with self._reader() as conn:
+            row = conn.execute(_SELECT_STATS_SQL[key], (value,)).fetchone()
+        return dict(row) if row else None
 
+    @_ttl_cached
     def get_period_stats(self, days: int = 7) -> Dict:
         """
         Get aggregated stats for a period.
@@ -244,42 +565,53 @@ class Analytics:
         Returns:
             Dict with aggregated metrics
         """
-        with sqlite3.connect(self.db_path) as conn:
+        # Summed from the daily_metrics rollup: O(days) rows, whole days
+        rows = self._daily_window(days)
+        total_posts, total_views, total_forwards, total_reactions, total_comments = (
+            sum(row[i] for row in rows) for i in range(1, 6)
+        )
+        total_engagement = total_forwards + total_reactions + total_comments
+        avg_err = round(total_engagement / total_views * 100, 2) if total_views > 0 else 0
+
+        def per_post(total: int) -> float:
+            return round(total / total_posts, 1) if total_posts else 0
+
+        return {
+            "period_days": days,
+            "total_posts": total_posts,
+            "total_views": total_views,
+            "total_forwards": total_forwards,
+            "total_reactions": total_reactions,
+            "total_comments": total_comments,
+            "avg_views_per_post": per_post(total_views),
+            "avg_forwards_per_post": per_post(total_forwards),
+            "avg_reactions_per_post": per_post(total_reactions),
+            "avg_err": avg_err,
+        }
+
+    @_ttl_cached
+    def _daily_window(self, days: int) -> List[tuple]:
+        """
+        daily_metrics rows for the last `days` days, oldest first.
+
+        One read shared by get_period_stats and get_growth_stats (both are
+        needed for /stats): (date, posts, views, forwards, reactions,
+        comments, subscribers).
+        """
+        with self._reader() as conn:
             cursor = conn.execute(
                 """
-                SELECT
-                    COUNT(*) as total_posts,
-                    COALESCE(SUM(views), 0) as total_views,
-                    COALESCE(SUM(forwards), 0) as total_forwards,
-                    COALESCE(SUM(reactions), 0) as total_reactions,
-                    COALESCE(SUM(comments), 0) as total_comments,
-                    COALESCE(AVG(views), 0) as avg_views,
-                    COALESCE(AVG(forwards), 0) as avg_forwards,
-                    COALESCE(AVG(reactions), 0) as avg_reactions
-                FROM post_stats
-                WHERE published_at > datetime('now', '-' || ? || ' days')
+                SELECT date, posts_published, total_views, total_forwards,
+                    total_reactions, total_comments, subscribers
+                FROM daily_metrics
+                WHERE date > ?
+                ORDER BY date ASC
                 """,
-                (days,),
+                (_cutoff(days).strftime("%Y-%m-%d"),),
             )
-            row = cursor.fetchone()
-
-            total_views = row[1] or 0
-            total_engagement = (row[2] or 0) + (row[3] or 0) + (row[4] or 0)
-            avg_err = round(total_engagement / total_views * 100, 2) if total_views > 0 else 0
-
-            return {
-                "period_days": days,
-                "total_posts": row[0] or 0,
-                "total_views": total_views,
-                "total_forwards": row[2] or 0,
-                "total_reactions": row[3] or 0,
-                "total_comments": row[4] or 0,
-                "avg_views_per_post": round(row[5] or 0, 1),
-                "avg_forwards_per_post": round(row[6] or 0, 1),
-                "avg_reactions_per_post": round(row[7] or 0, 1),
-                "avg_err": avg_err,
-            }
+            return [tuple(v or 0 for v in row) for row in cursor]
 
+    @_ttl_cached
     def get_top_posts(self, days: int = 30, limit: int = 5, sort_by: str = "views") -> List[Dict]:
         """
         Get top performing posts.
@@ -290,32 +622,30 @@ class Analytics:
             sort_by: Metric to sort by (views, forwards, reactions, err)
 
         Returns:
-            List of top posts with stats
+            List of top posts with stats, format and article_title
+            (post_text is not loaded)
         """
-        valid_sorts = ["views", "forwards", "reactions", "comments"]
-        if sort_by not in valid_sorts:
+        if sort_by not in TOP_POST_SORTS:
             sort_by = "views"
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cursor = conn.execute(
                 f"""
-                SELECT ps.*, pq.post_text, pq.format, pq.article_title
+                SELECT ps.post_id, ps.message_id, ps.views, ps.forwards,
+                    ps.reactions, ps.comments, ps.clicks, ps.ab_group, ps.published_at,
+                    pq.format, pq.article_title,
+                    {ERR_SQL.format(p='ps.')} AS err
                 FROM post_stats ps
                 LEFT JOIN post_queue pq ON ps.post_id = pq.id
-                WHERE ps.published_at > datetime('now', '-' || ? || ' days')
+                WHERE ps.published_at > ?
                 ORDER BY ps.{sort_by} DESC
                 LIMIT ?
                 """,
-                (days, limit),
+                (_cutoff(days), limit),
             )
-            posts = []
-            for row in cursor.fetchall():
-                post = dict(row)
-                post["err"] = self._calculate_err(post)
-                posts.append(post)
-            return posts
+            return [dict(row) for row in cursor]
 
+    @_ttl_cached
     def get_daily_breakdown(self, days: int = 7) -> List[Dict]:
         """
         Get daily breakdown of metrics.
@@ -326,33 +656,27 @@ class Analytics:
         Returns:
             List of daily stats
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cursor = conn.execute(
                 """
                 SELECT
-                    date(published_at) as day,
-                    COUNT(*) as posts,
-                    COALESCE(SUM(views), 0) as views,
-                    COALESCE(SUM(forwards), 0) as forwards,
-                    COALESCE(SUM(reactions), 0) as reactions,
-                    COALESCE(AVG(views), 0) as avg_views
-                FROM post_stats
-                WHERE published_at > datetime('now', '-' || ? || ' days')
-                GROUP BY date(published_at)
-                ORDER BY day DESC
+                    date as day,
+                    posts_published as posts,
+                    total_views as views,
+                    total_forwards as forwards,
+                    total_reactions as reactions,
+                    total_views * 1.0 / posts_published as avg_views,
+                    avg_err as err
+                FROM daily_metrics
+                WHERE date > ?
+                AND posts_published > 0
+                ORDER BY date DESC
                 """,
-                (days,),
+                (_cutoff(days).strftime("%Y-%m-%d"),),
             )
-            result = []
-            for row in cursor.fetchall():
-                day_stats = dict(row)
-                views = day_stats["views"]
-                engagement = day_stats["forwards"] + day_stats["reactions"]
-                day_stats["err"] = round(engagement / views * 100, 2) if views > 0 else 0
-                result.append(day_stats)
-            return result
+            return [dict(row) for row in cursor]
 
+    @_ttl_cached
     def get_ab_comparison(self, days: int = 30) -> Dict:
         """
         Compare A/B test groups performance.
@@ -363,13 +687,12 @@ class Analytics:
         Returns:
             Dict with comparison metrics for each group
         """
-        with sqlite3.connect(self.db_path) as conn:
-            results = {}
-
-            for group in ["A", "B"]:
-                cursor = conn.execute(
-                    """
+        with self._reader() as conn:
+            cursor = conn.execute(
+                """
+                WITH g AS (
                     SELECT
+                        ab_group,
                         COUNT(*) as posts,
                         COALESCE(SUM(views), 0) as total_views,
                         COALESCE(SUM(forwards), 0) as total_forwards,
@@ -378,72 +701,55 @@ class Analytics:
                         COALESCE(AVG(forwards), 0) as avg_forwards,
                         COALESCE(AVG(reactions), 0) as avg_reactions
                     FROM post_stats
-                    WHERE ab_group = ?
-                    AND published_at > datetime('now', '-' || ? || ' days')
-                    """,
-                    (group, days),
+                    WHERE ab_group IN ('A', 'B')
+                    AND published_at > ?
+                    GROUP BY ab_group
                 )
-                row = cursor.fetchone()
-
-                total_views = row[1] or 0
-                total_engagement = (row[2] or 0) + (row[3] or 0)
-                avg_err = round(total_engagement / total_views * 100, 2) if total_views > 0 else 0
-
-                results[group] = {
-                    "posts": row[0] or 0,
-                    "total_views": total_views,
-                    "total_forwards": row[2] or 0,
-                    "total_reactions": row[3] or 0,
-                    "avg_views": round(row[4] or 0, 1),
-                    "avg_forwards": round(row[5] or 0, 2),
-                    "avg_reactions": round(row[6] or 0, 2),
-                    "avg_err": avg_err,
-                }
-
-            # Calculate winner
-            if results["A"]["avg_err"] > results["B"]["avg_err"]:
-                winner = "A"
-                diff = results["A"]["avg_err"] - results["B"]["avg_err"]
-            elif results["B"]["avg_err"] > results["A"]["avg_err"]:
-                winner = "B"
-                diff = results["B"]["avg_err"] - results["A"]["avg_err"]
-            else:
-                winner = "tie"
-                diff = 0
+                SELECT
+                    ab_group, posts, total_views, total_forwards, total_reactions,
+                    ROUND(avg_views, 1) as avg_views,
+                    ROUND(avg_forwards, 2) as avg_forwards,
+                    ROUND(avg_reactions, 2) as avg_reactions,
+                    COALESCE(ROUND((total_forwards + total_reactions) * 100.0
+                                   / NULLIF(total_views, 0), 2), 0) as avg_err
+                FROM g
+                """,
+                (_cutoff(days),),
+            )
+            rows = {row["ab_group"]: row for row in cursor}
 
-            return {
-                "period_days": days,
-                "groups": results,
-                "winner": winner,
-                "err_difference": round(diff, 2),
-            }
+        results = {}
+        for group in ("A", "B"):
+            row = rows.get(group)
+            # Group without posts in the period gets zeros
+            results[group] = {key: row[key] for key in _AB_KEYS} if row else dict.fromkeys(_AB_KEYS, 0)
+
+        a_err, b_err = results["A"]["avg_err"], results["B"]["avg_err"]
+        winner = "tie" if a_err == b_err else max(results, key=lambda g: results[g]["avg_err"])
 
+        return {
+            "period_days": days,
+            "groups": results,
+            "winner": winner,
+            "err_difference": round(abs(a_err - b_err), 2),
+        }
+
+    @_ttl_cached
     def format_ab_comparison_message(self, days: int = 30) -> str:
         """Format A/B comparison as Telegram message."""
         data = self.get_ab_comparison(days)
         groups = data["groups"]
 
-        lines = [
-            f"🔬 <b>A/B тест за {days} дней</b>",
-            "",
-        ]
-
-        for group_name in ["A", "B"]:
-            g = groups[group_name]
-            lines.extend([
-                f"<b>Группа {group_name}:</b>",
-                f"  📝 Постов: {g['posts']}",
-                f"  👁 Avg views: {g['avg_views']:.0f}",
-                f"  📈 Avg ERR: {g['avg_err']}%",
-                "",
-            ])
-
+        parts = [_AB_HEADER_TMPL.format(days=days)]
+        parts.extend(
+            _AB_GROUP_TMPL.format(name=name, **groups[name]) for name in ("A", "B")
+        )
         if data["winner"] != "tie":
-            lines.append(f"🏆 Лидер: группа <b>{data['winner']}</b> (+{data['err_difference']}% ERR)")
+            parts.append(_AB_WINNER_TMPL.format(**data))
         else:
-            lines.append("🤝 Результаты одинаковые")
+            parts.append(_AB_TIE)
 
-        return "\n".join(lines)
+        return "\n".join(parts)
 
     def update_daily_metrics(self, date: str = None, subscribers: int = None) -> bool:
         """
@@ -451,49 +757,26 @@ class Analytics:
 
         Args:
             date: Date in YYYY-MM-DD format (default: today)
-            subscribers: Current subscriber count
+            subscribers: Current subscriber count (None keeps the stored value)
 
         Returns:
             True if updated successfully
         """
+        now = datetime.now()
         if date is None:
-            date = datetime.now().strftime("%Y-%m-%d")
+            date = now.strftime("%Y-%m-%d")
 
-        # Calculate metrics from post_stats
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """
-                SELECT
-                    COUNT(*) as posts,
-                    COALESCE(SUM(views), 0) as views,
-                    COALESCE(SUM(forwards), 0) as forwards,
-                    COALESCE(SUM(reactions), 0) as reactions
-                FROM post_stats
-                WHERE date(published_at) = ?
-                """,
-                (date,),
-            )
-            row = cursor.fetchone()
-            posts = row[0] or 0
-            views = row[1] or 0
-            forwards = row[2] or 0
-            reactions = row[3] or 0
-
-            engagement = forwards + reactions
-            avg_err = round(engagement / views * 100, 2) if views > 0 else 0
-
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO daily_metrics
-                (date, posts_published, total_views, total_forwards, total_reactions, avg_err, subscribers, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (date, posts, views, forwards, reactions, avg_err, subscribers, datetime.now().isoformat()),
-            )
-            conn.commit()
-            logger.info(f"Updated daily metrics for {date}")
-            return True
+        with self._transaction() as conn:
+            self._refresh_daily_rollup(conn, [date], now)
+            if subscribers is not None:
+                conn.execute(
+                    "UPDATE daily_metrics SET subscribers = ? WHERE date = ?",
+                    (subscribers, date),
+                )
+        logger.info(f"Updated daily metrics for {date}")
+        return True
 
+    @_ttl_cached
     def get_growth_stats(self, days: int = 30) -> Dict:
         """
         Get subscriber growth and trend stats.
@@ -504,44 +787,34 @@ class Analytics:
         Returns:
             Dict with growth metrics
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """
-                SELECT date, subscribers
-                FROM daily_metrics
-                WHERE date > date('now', '-' || ? || ' days')
-                AND subscribers > 0
-                ORDER BY date ASC
-                """,
-                (days,),
-            )
-            rows = cursor.fetchall()
-
-            if len(rows) < 2:
-                return {
-                    "period_days": days,
-                    "start_subscribers": 0,
-                    "end_subscribers": 0,
-                    "growth": 0,
-                    "growth_percent": 0,
-                    "avg_daily_growth": 0,
-                }
-
-            start_subs = rows[0][1]
-            end_subs = rows[-1][1]
-            growth = end_subs - start_subs
-            growth_percent = round(growth / start_subs * 100, 2) if start_subs > 0 else 0
-            avg_daily = round(growth / len(rows), 1)
+        subscribers = [row[6] for row in self._daily_window(days) if row[6] > 0]
 
+        if len(subscribers) < 2:
             return {
                 "period_days": days,
-                "start_subscribers": start_subs,
-                "end_subscribers": end_subs,
-                "growth": growth,
-                "growth_percent": growth_percent,
-                "avg_daily_growth": avg_daily,
+                "start_subscribers": 0,
+                "end_subscribers": 0,
+                "growth": 0,
+                "growth_percent": 0,
+                "avg_daily_growth": 0,
             }
 
+        start_subs = subscribers[0]
+        end_subs = subscribers[-1]
+        growth = end_subs - start_subs
+        growth_percent = round(growth / start_subs * 100, 2) if start_subs > 0 else 0
+        avg_daily = round(growth / len(subscribers), 1)
+
+        return {
+            "period_days": days,
+            "start_subscribers": start_subs,
+            "end_subscribers": end_subs,
+            "growth": growth,
+            "growth_percent": growth_percent,
+            "avg_daily_growth": avg_daily,
+        }
+
+    @_ttl_cached
     def format_stats_message(self, days: int = 7) -> str:
         """
         Format stats as a Telegram message.
@@ -556,34 +829,38 @@ class Analytics:
         growth = self.get_growth_stats(days)
         top_posts = self.get_top_posts(days=days, limit=3, sort_by="views")
 
-        lines = [
-            f"📊 <b>Аналитика за {days} дней</b>",
-            "",
-            f"📝 Постов: {stats['total_posts']}",
-            f"👁 Просмотров: {stats['total_views']:,}",
-            f"🔄 Репостов: {stats['total_forwards']}",
-            f"❤️ Реакций: {stats['total_reactions']}",
-            "",
-            f"📈 Средний ERR: {stats['avg_err']}%",
-            f"👁 Среднее просмотров/пост: {stats['avg_views_per_post']:.0f}",
-        ]
+        lines = [_STATS_HEADER_TMPL.format(days=days, **stats)]
 
         if growth["end_subscribers"] > 0:
-            lines.extend([
-                "",
-                f"👥 Подписчиков: {growth['end_subscribers']:,}",
-                f"📈 Рост: +{growth['growth']} ({growth['growth_percent']}%)",
-            ])
+            lines.append(_STATS_GROWTH_TMPL.format(**growth))
 
         if top_posts:
             lines.extend(["", "🏆 <b>Топ посты:</b>"])
             for i, post in enumerate(top_posts, 1):
-                title = post.get("article_title", "")[:30] or "Без названия"
+                # article_title is NULL when the queue row was cleaned up
+                title = (post.get("article_title") or "")[:30] or "Без названия"
                 lines.append(f"{i}. {title}... — {post['views']} 👁")
 
         return "\n".join(lines)
 
 
+# Singleton instance
+_analytics: Optional[Analytics] = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics() -> Analytics:
+    """Get or create analytics singleton (shares one connection)."""
+    global _analytics
+    if _analytics is None:
+        # Bot handlers call this from worker threads: build exactly one
+        # instance, so all writes go through one connection and its lock
+        with _analytics_lock:
+            if _analytics is None:
+                _analytics = Analytics()
+    return _analytics
+
+
 if __name__ == "__main__":
     # Test analytics
     analytics = Analytics()
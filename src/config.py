@@ -1,8 +1,10 @@
 """Configuration management with Pydantic validation."""
 
 import os
+from dataclasses import make_dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
@@ -26,6 +28,13 @@ class Settings(BaseSettings):
         description="OpenAI API key for image generation"
     )
 
+    openai_image_rpm: int = Field(
+        default=5,
+        ge=1,
+        alias="OPENAI_IMAGE_RPM",
+        description="Images per minute allowed by the OpenAI account tier"
+    )
+
     # Telegram Bot
     telegram_bot_token: str = Field(
         ...,
@@ -172,16 +181,32 @@ class Settings(BaseSettings):
         return [t.strip() for t in self.digest_times.split(",") if t.strip()]
 
 
-# Singleton instance
-_settings: Optional[Settings] = None
+# Validated settings copied into a frozen slots dataclass: plain attribute
+# access for callers, no pydantic machinery after startup
+def _frozen_digest_times_list(self) -> List[str]:
+    """Digest times parsed once in get_settings."""
+    return list(self.digest_times_parsed)
 
 
-def get_settings() -> Settings:
+FrozenSettings = make_dataclass(
+    "FrozenSettings",
+    [(name, field.annotation) for name, field in Settings.model_fields.items()]
+    + [("digest_times_parsed", Tuple[str, ...])],
+    frozen=True,
+    slots=True,
+    namespace={"get_digest_times_list": _frozen_digest_times_list},
+)
+FrozenSettings.__doc__ = "Read-only application settings (see Settings)."
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> FrozenSettings:
     """Get or create settings instance."""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    settings = Settings()
+    return FrozenSettings(
+        **{name: getattr(settings, name) for name in Settings.model_fields},
+        digest_times_parsed=tuple(settings.get_digest_times_list()),
+    )
 
 
 def validate_config() -> bool:
@@ -205,5 +230,4 @@ def validate_config() -> bool:
 
 def reset_settings() -> None:
     """Reset settings singleton (useful for testing)."""
-    global _settings
-    _settings = None
+    get_settings.cache_clear()
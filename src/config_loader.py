@@ -1,26 +1,40 @@
 """Загрузчик YAML конфигов."""
 
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 import yaml
 
-_cache: Dict[str, Any] = {}
+# libyaml C loader если собран, иначе pure-Python
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# filename -> (mtime_ns, data)
+_cache: Dict[str, Tuple[int, Any]] = {}
 CONFIG_DIR = Path(__file__).parent.parent / "config"
 
 
 def load_yaml(filename: str) -> Dict[str, Any]:
-    """Загрузить YAML файл из config/."""
-    if filename in _cache:
-        return _cache[filename]
+    """
+    Загрузить YAML файл из config/.
 
+    Кэшируется по mtime: изменённый файл перечитывается без рестарта бота.
+    """
     path = CONFIG_DIR / filename
-    if not path.exists():
-        raise FileNotFoundError(f"Config not found: {path}")
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config not found: {path}") from None
+
+    cached = _cache.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
 
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+        data = yaml.load(f, Loader=_Loader) or {}
 
-    _cache[filename] = data
+    _cache[filename] = (mtime, data)
     return data
 
 
@@ -2,14 +2,59 @@
 
 import re
 import sqlite3
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from logger import get_logger
 
 logger = get_logger("news_bot.db")
 
+# Normalizer patterns, compiled once
+_RE_PROTO = re.compile(r"^https?://")
+_RE_WWW = re.compile(r"^www\.")
+_RE_UTM = re.compile(r"\?utm_[^&]+(&utm_[^&]+)*")
+_RE_NONWORD = re.compile(r"[^\w\s]")
+_RE_WS = re.compile(r"\s+")
+
+_SCHEMA_SQL = """
+BEGIN;
+CREATE TABLE IF NOT EXISTS sent_articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    article_link TEXT UNIQUE NOT NULL,
+    title TEXT,
+    title_normalized TEXT,
+    url_normalized TEXT,
+    relevance_score INTEGER DEFAULT 0,
+    category TEXT,
+    status TEXT DEFAULT 'published',
+    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+-- article_link is UNIQUE, its implicit index already serves lookups
+DROP INDEX IF EXISTS idx_article_link;
+CREATE INDEX IF NOT EXISTS idx_url_normalized ON sent_articles(url_normalized);
+CREATE INDEX IF NOT EXISTS idx_title_normalized ON sent_articles(title_normalized);
+-- Covers the sent_at range reports (stats, daily summary) without row reads;
+-- replaces the single-column idx_sent_at
+CREATE INDEX IF NOT EXISTS idx_sent_cover
+    ON sent_articles(sent_at, category, status, relevance_score);
+DROP INDEX IF EXISTS idx_sent_at;
+COMMIT;
+"""
+
+# One query tells whether _SCHEMA_SQL is fully applied: all its indexes
+# exist (so the columns they need do too) and the dropped ones are gone.
+# PRAGMA user_version of the shared file belongs to analytics.
+_SCHEMA_CURRENT_SQL = """
+SELECT
+    COUNT(*) FILTER (WHERE name IN ('idx_sent_cover', 'idx_url_normalized', 'idx_title_normalized')) = 3
+    AND COUNT(*) FILTER (WHERE name IN ('idx_sent_at', 'idx_article_link')) = 0
+FROM sqlite_master
+WHERE type = 'index' AND tbl_name = 'sent_articles'
+"""
+
 
 class Database:
     """SQLite database for tracking sent articles."""
@@ -18,55 +63,65 @@ class Database:
         """Initialize database."""
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One long-lived connection, shared across threads under a lock.
+        # synchronous=NORMAL is crash-safe in WAL mode and skips the fsync
+        # on every commit; temp tables/sorts stay in memory.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-64000")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._lock = threading.RLock()
         self._init_db()
 
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Shared connection: commits on success, rolls back on error."""
+        with self._lock:
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def close(self):
+        """Refresh planner statistics and close the connection."""
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+
     def _init_db(self):
         """Create tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            # Check if table exists (for migration)
+        with self._connect() as conn:
+            # Warm start: schema is current, skip the probes and DDL
+            if conn.execute(_SCHEMA_CURRENT_SQL).fetchone()[0]:
+                return
+
+            # WAL is persistent in the db file: readers (bot, analytics)
+            # no longer block on the scheduler's writes and vice versa
+            conn.execute("PRAGMA journal_mode=WAL")
+
+            # Existing table: add new columns FIRST, the indexes need them
             cursor = conn.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' AND name='sent_articles'"
             )
-            table_exists = cursor.fetchone() is not None
-
-            if table_exists:
-                # Migration: add new columns FIRST before creating indexes
+            if cursor.fetchone() is not None:
                 self._migrate_add_columns(conn)
-            else:
-                # Create new table with all columns
-                conn.execute("""
-                    CREATE TABLE sent_articles (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        article_link TEXT UNIQUE NOT NULL,
-                        title TEXT,
-                        title_normalized TEXT,
-                        url_normalized TEXT,
-                        relevance_score INTEGER DEFAULT 0,
-                        category TEXT,
-                        status TEXT DEFAULT 'published',
-                        sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-            # Create indexes (now safe - columns exist)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_article_link
-                ON sent_articles(article_link)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_url_normalized
-                ON sent_articles(url_normalized)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_title_normalized
-                ON sent_articles(title_normalized)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_sent_at
-                ON sent_articles(sent_at)
-            """)
-
-            conn.commit()
+
+            cursor = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_sent_cover'"
+            )
+            new_index = cursor.fetchone() is None
+
+            # One parse, one transaction, one commit
+            conn.executescript(_SCHEMA_SQL)
+
+            if new_index:
+                # Give the planner statistics for the new index
+                conn.execute("ANALYZE sent_articles")
 
     def _migrate_add_columns(self, conn):
         """Add new columns to existing tables if they don't exist."""
@@ -98,10 +153,10 @@ class Database:
         if not url:
             return ""
         url = url.lower().strip()
-        url = re.sub(r"^https?://", "", url)
-        url = re.sub(r"^www\.", "", url)
+        url = _RE_PROTO.sub("", url)
+        url = _RE_WWW.sub("", url)
         url = url.rstrip("/")
-        url = re.sub(r"\?utm_[^&]+(&utm_[^&]+)*", "", url)
+        url = _RE_UTM.sub("", url)
         return url
 
     @staticmethod
@@ -110,13 +165,13 @@ class Database:
         if not title:
             return ""
         title = title.lower()
-        title = re.sub(r"[^\w\s]", "", title)
-        title = re.sub(r"\s+", " ", title).strip()
+        title = _RE_NONWORD.sub("", title)
+        title = _RE_WS.sub(" ", title).strip()
         return title
 
     def is_article_sent(self, link: str) -> bool:
         """Check if article was already sent."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM sent_articles WHERE article_link = ?",
                 (link,)
@@ -131,70 +186,111 @@ class Database:
         category: str = "",
         status: str = "published",
     ):
-        """Mark article as sent with normalized fields."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """INSERT INTO sent_articles
-                    (article_link, title, title_normalized, url_normalized,
-                     relevance_score, category, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        link,
-                        title,
-                        self.normalize_title(title),
-                        self.normalize_url(link),
-                        relevance_score,
-                        category,
-                        status,
-                    ),
-                )
-                conn.commit()
-        except sqlite3.IntegrityError:
-            # Article already exists
-            pass
+        """Mark article as sent with normalized fields (already sent is a no-op)."""
+        self.mark_articles_sent([{
+            "link": link,
+            "title": title,
+            "relevance_score": relevance_score,
+            "category": category,
+            "status": status,
+        }])
 
     def filter_unsent_articles(self, articles: List[dict]) -> List[dict]:
-        """Filter out already sent articles."""
-        unsent = []
+        """Filter out already sent articles (one IN query per 500 links)."""
+        links = list({article['link'] for article in articles})
+        sent = set()
+        with self._connect() as conn:
+            # Stay under SQLITE_MAX_VARIABLE_NUMBER (999 on older builds)
+            for i in range(0, len(links), 500):
+                chunk = links[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"SELECT article_link FROM sent_articles WHERE article_link IN ({placeholders})",
+                    chunk,
+                )
+                sent.update(row[0] for row in cursor)
+        return [article for article in articles if article['link'] not in sent]
+
+    def mark_articles_sent(self, articles: List[Dict]) -> None:
+        """
+        Mark many articles as sent in a single transaction.
+
+        Args:
+            articles: Dicts with 'link' and optional 'title',
+                'relevance_score', 'category', 'status' keys
+        """
+        rows = []
         for article in articles:
-            if not self.is_article_sent(article['link']):
-                unsent.append(article)
-        return unsent
-
-    def cleanup_old_records(self, days: int = 30):
-        """Remove records older than specified days."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                DELETE FROM sent_articles
-                WHERE sent_at < datetime('now', '-' || ? || ' days')
-                """,
-                (days,)
+            title = article.get("title") or ""
+            rows.append((
+                article["link"],
+                title,
+                self.normalize_title(title),
+                self.normalize_url(article["link"]),
+                article.get("relevance_score", 0),
+                article.get("category", ""),
+                article.get("status", "published"),
+            ))
+        if not rows:
+            return
+
+        with self._connect() as conn:
+            # OR IGNORE: one already-sent link must not abort the whole batch
+            conn.executemany(
+                """INSERT OR IGNORE INTO sent_articles
+                (article_link, title, title_normalized, url_normalized,
+                 relevance_score, category, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows,
             )
-            conn.commit()
 
-    def get_stats(self) -> dict:
-        """Get database statistics."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT COUNT(*), MAX(sent_at) FROM sent_articles"
-            )
-            count, last_sent = cursor.fetchone()
+    def cleanup_old_records(self, days: int = 30, batch_size: int = 1000) -> int:
+        """
+        Remove records older than specified days.
+
+        Deletes in batches, committing after each one, so the write lock
+        (and the shared connection) is never held for the whole purge.
+
+        Returns:
+            Number of deleted records
+        """
+        # sent_at is CURRENT_TIMESTAMP text (UTC), compare against the same format
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        deleted = 0
+        while True:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    """DELETE FROM sent_articles WHERE id IN (
+                        SELECT id FROM sent_articles
+                        WHERE sent_at < ? ORDER BY sent_at LIMIT ?
+                    )""",
+                    (cutoff, batch_size),
+                )
+            deleted += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
 
-            # Queue stats
-            cursor = conn.execute(
-                """SELECT COUNT(*) FROM post_queue
-                WHERE status = 'pending' AND scheduled_at > datetime('now')"""
-            )
-            queue_count = cursor.fetchone()[0] or 0
+        if deleted:
+            with self._lock:
+                # Give the space the purge freed in the WAL back to the disk
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.info(f"Removed {deleted} records older than {days} days")
+        return deleted
 
-            # Today's stats
+    def get_stats(self) -> dict:
+        """Get database statistics."""
+        with self._connect() as conn:
+            # Total, last and today's count in one pass over idx_sent_cover,
+            # queue size as a scalar subquery of the same statement
             cursor = conn.execute(
-                """SELECT COUNT(*) FROM sent_articles
-                WHERE date(sent_at) = date('now')"""
+                """SELECT COUNT(*), MAX(sent_at), SUM(sent_at >= date('now')),
+                    (SELECT COUNT(*) FROM post_queue
+                     WHERE status = 'pending' AND scheduled_at > datetime('now'))
+                FROM sent_articles"""
             )
-            today_count = cursor.fetchone()[0] or 0
+            count, last_sent, today_count, queue_count = cursor.fetchone()
 
             # Category breakdown
             cursor = conn.execute(
@@ -207,22 +303,25 @@ class Database:
             return {
                 "total_articles": count or 0,
                 "last_sent": last_sent,
-                "queue_size": queue_count,
-                "today_published": today_count,
+                "queue_size": queue_count or 0,
+                "today_published": today_count or 0,
                 "categories_7d": categories,
             }
 
     def get_recent_titles(self, days: int = 7, limit: int = 1000) -> List[Tuple[str, str]]:
         """Get recent titles for deduplicator initialization."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
+        with self._connect() as conn:
+            # Plain tuples straight from the C layer, no Row objects to repack
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(
                 """SELECT title, article_link FROM sent_articles
                 WHERE sent_at > datetime('now', '-' || ? || ' days')
                 ORDER BY sent_at DESC
                 LIMIT ?""",
                 (days, limit),
             )
-            return [(row[0], row[1]) for row in cursor.fetchall()]
+            return cursor.fetchall()
 
     def add_to_queue(
         self,
@@ -234,20 +333,18 @@ class Database:
         scheduled_at: Optional[str] = None,
     ) -> int:
         """Add post to queue."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(
                 """INSERT INTO post_queue
                 (article_link, title, post_text, post_format, image_prompt, scheduled_at)
                 VALUES (?, ?, ?, ?, ?, ?)""",
                 (article_link, title, post_text, post_format, image_prompt, scheduled_at),
             )
-            conn.commit()
             return cursor.lastrowid
 
-    def get_pending_posts(self, limit: int = 10) -> List[Dict]:
-        """Get pending posts from queue."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+    def get_pending_posts(self, limit: int = 10) -> List[sqlite3.Row]:
+        """Get pending posts from queue (rows support post["column"] access)."""
+        with self._connect() as conn:
             cursor = conn.execute(
                 """SELECT * FROM post_queue
                 WHERE status = 'pending'
@@ -256,21 +353,19 @@ class Database:
                 LIMIT ?""",
                 (limit,),
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return cursor.fetchall()
 
     def update_queue_status(self, queue_id: int, status: str):
         """Update post queue status."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute(
                 "UPDATE post_queue SET status = ? WHERE id = ?",
                 (status, queue_id),
             )
-            conn.commit()
 
     def get_daily_summary(self, days: int = 7) -> List[Dict]:
         """Get daily summary for monitoring."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connect() as conn:
             cursor = conn.execute(
                 """SELECT
                     date(sent_at) as day,
@@ -288,7 +383,7 @@ class Database:
 
     def get_queue_health(self) -> Dict:
         """Get queue health status for monitoring."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(
                 """SELECT
                     COUNT(*) as posts_in_buffer,
@@ -2,13 +2,87 @@
 
 import hashlib
 import re
+from collections import Counter, defaultdict, deque
 from dataclasses import dataclass, field
-from typing import List, Optional, Set, Tuple
+from functools import lru_cache
+from typing import DefaultDict, Deque, Dict, FrozenSet, List, Optional, Set, Tuple
 
 from logger import get_logger
 
 logger = get_logger("news_bot.deduplicator")
 
+# Normalizer patterns, compiled once
+_RE_NONWORD = re.compile(r"[^\w\s]")
+_RE_DIGITS = re.compile(r"\d+")
+_RE_WS = re.compile(r"\s+")
+_RE_PROTO = re.compile(r"^https?://")
+_RE_WWW = re.compile(r"^www\.")
+_RE_UTM = re.compile(r"\?utm_[^&]+(&utm_[^&]+)*")
+_RE_REF = re.compile(r"\?ref=[^&]+")
+_RE_TRAIL = re.compile(r"[?&]$")
+
+
+# Titles and URLs repeat across feeds, checks and history reloads:
+# normalization is memoized
+@lru_cache(maxsize=4096)
+def _normalize_text(text: str, stop_words: FrozenSet[str]) -> str:
+    """See ContentDeduplicator.normalize_text."""
+    if not text:
+        return ""
+
+    # Lowercase
+    text = text.lower()
+
+    # Remove punctuation and special characters
+    text = _RE_NONWORD.sub("", text)
+
+    # Remove numbers (they often differ in similar articles)
+    text = _RE_DIGITS.sub("", text)
+
+    # Collapse whitespace
+    text = _RE_WS.sub(" ", text).strip()
+
+    # Remove stop words
+    words = [w for w in text.split() if w not in stop_words and len(w) > 2]
+
+    return " ".join(words)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_url(url: str) -> str:
+    """See ContentDeduplicator.normalize_url."""
+    if not url:
+        return ""
+
+    url = url.lower().strip()
+
+    # Remove protocol
+    url = _RE_PROTO.sub("", url)
+
+    # Remove www.
+    url = _RE_WWW.sub("", url)
+
+    # Remove trailing slash
+    url = url.rstrip("/")
+
+    # Remove common tracking parameters
+    url = _RE_UTM.sub("", url)
+    url = _RE_REF.sub("", url)
+    url = _RE_TRAIL.sub("", url)
+
+    return url
+
+
+@lru_cache(maxsize=4096)
+def _ngrams(normalized: str, size: int) -> FrozenSet[str]:
+    """Character n-grams of an already normalized string."""
+    if len(normalized) < size:
+        return frozenset((normalized,)) if normalized else frozenset()
+
+    return frozenset(
+        {normalized[i : i + size] for i in range(len(normalized) - size + 1)}
+    )
+
 
 @dataclass
 class DuplicateResult:
@@ -31,7 +105,7 @@ class ContentDeduplicator:
     """
 
     # Stop words to remove for normalization (English + Russian)
-    STOP_WORDS = {
+    STOP_WORDS = frozenset({
         # English
         "the",
         "a",
@@ -96,7 +170,7 @@ class ContentDeduplicator:
         "новый",
         "новые",
         "топ",
-    }
+    })
 
     def __init__(
         self,
@@ -116,9 +190,18 @@ class ContentDeduplicator:
         self.ngram_size = ngram_size
         self.max_history = max_history
 
-        self.seen_hashes: Set[str] = set()
-        self.seen_urls: Set[str] = set()
-        self.seen_titles: List[Tuple[str, str]] = []  # (original, normalized)
+        self.seen_hashes: Set[bytes] = set()
+        # hash() of the normalized URL: only membership is ever tested, and
+        # an int is far smaller than the URL string (in-process only)
+        self.seen_urls: Set[int] = set()
+        # (original, n-grams): n-grams are computed once, when the title is added
+        # Oldest titles fall off the left end once max_history is reached
+        self.seen_titles: Deque[Tuple[str, FrozenSet[str]]] = deque(maxlen=max_history)
+        # n-gram -> ids of history titles containing it. Ids grow by one per
+        # title; evicted ids stay in the lists until the next compaction.
+        self._ngram_index: DefaultDict[str, List[int]] = defaultdict(list)
+        self._next_id = 0
+        self._evicted = 0
 
         logger.info(
             f"Deduplicator initialized: threshold={similarity_threshold}, "
@@ -134,59 +217,15 @@ class ContentDeduplicator:
         - Remove stop words
         - Collapse whitespace
         """
-        if not text:
-            return ""
-
-        # Lowercase
-        text = text.lower()
-
-        # Remove punctuation and special characters
-        text = re.sub(r"[^\w\s]", "", text)
-
-        # Remove numbers (they often differ in similar articles)
-        text = re.sub(r"\d+", "", text)
-
-        # Collapse whitespace
-        text = re.sub(r"\s+", " ", text).strip()
-
-        # Remove stop words
-        words = [w for w in text.split() if w not in self.STOP_WORDS and len(w) > 2]
-
-        return " ".join(words)
+        return _normalize_text(text, self.STOP_WORDS)
 
     def normalize_url(self, url: str) -> str:
         """Normalize URL for comparison."""
-        if not url:
-            return ""
-
-        url = url.lower().strip()
-
-        # Remove protocol
-        url = re.sub(r"^https?://", "", url)
-
-        # Remove www.
-        url = re.sub(r"^www\.", "", url)
-
-        # Remove trailing slash
-        url = url.rstrip("/")
+        return _normalize_url(url)
 
-        # Remove common tracking parameters
-        url = re.sub(r"\?utm_[^&]+(&utm_[^&]+)*", "", url)
-        url = re.sub(r"\?ref=[^&]+", "", url)
-        url = re.sub(r"[?&]$", "", url)
-
-        return url
-
-    def get_ngrams(self, text: str) -> Set[str]:
+    def get_ngrams(self, text: str) -> FrozenSet[str]:
         """Generate character n-grams from text."""
-        normalized = self.normalize_text(text)
-        if len(normalized) < self.ngram_size:
-            return {normalized} if normalized else set()
-
-        return {
-            normalized[i : i + self.ngram_size]
-            for i in range(len(normalized) - self.ngram_size + 1)
-        }
+        return _ngrams(self.normalize_text(text), self.ngram_size)
 
     def jaccard_similarity(self, set1: Set[str], set2: Set[str]) -> float:
         """Calculate Jaccard similarity coefficient between two sets."""
@@ -200,13 +239,18 @@ class ContentDeduplicator:
 
     def compute_hash(
         self, title: str, url: str, content: Optional[str] = None
-    ) -> str:
-        """Compute SHA-256 hash for exact matching."""
+    ) -> bytes:
+        """
+        Compute hash for exact matching.
+
+        Only collision resistance matters here, not security: a 128-bit
+        BLAKE2b digest kept as raw bytes is cheaper than SHA-256 hex.
+        """
         hash_input = f"{title}|{url}"
         if content:
             hash_input += f"|{content[:500]}"
 
-        return hashlib.sha256(hash_input.encode()).hexdigest()
+        return hashlib.blake2b(hash_input.encode(), digest_size=16).digest()
 
     def check_duplicate(
         self,
@@ -230,9 +274,41 @@ class ContentDeduplicator:
         Returns:
             DuplicateResult with is_duplicate, reason, and similarity score
         """
+        return self._check(title, url, content)
+
+    def check_duplicates_batch(self, articles: List[Dict]) -> List[DuplicateResult]:
+        """
+        Check many articles at once (same semantics as calling
+        check_duplicate for each article in order).
+
+        Args:
+            articles: Article dicts with 'title', 'link' and optional 'summary'
+
+        Returns:
+            DuplicateResult per article, in input order
+        """
+        results = []
+        for article in articles:
+            # Unique articles go into history, so later ones in the batch
+            # are compared against them
+            results.append(self._check(
+                article.get("title", ""),
+                article.get("link", ""),
+                article.get("summary", ""),
+            ))
+
+        return results
+
+    def _check(
+        self,
+        title: str,
+        url: str,
+        content: Optional[str],
+    ) -> DuplicateResult:
+        """Run URL, hash and fuzzy checks; add unique items to history."""
         # 1. Exact URL match
         url_normalized = self.normalize_url(url)
-        if url_normalized and url_normalized in self.seen_urls:
+        if url_normalized and hash(url_normalized) in self.seen_urls:
             logger.debug(f"Exact URL match: {url_normalized}")
             return DuplicateResult(
                 is_duplicate=True,
@@ -253,11 +329,32 @@ class ContentDeduplicator:
         # 3. Fuzzy title match
         title_ngrams = self.get_ngrams(title)
         if title_ngrams:
-            for original_title, normalized_title in self.seen_titles:
-                seen_ngrams = self.get_ngrams(original_title)
-                similarity = self.jaccard_similarity(title_ngrams, seen_ngrams)
-
-                if similarity >= self.similarity_threshold:
+            # Only titles sharing at least one n-gram can match; the shared
+            # count is the intersection size, so Jaccard needs no set ops
+            # Hot loops: bound methods and attributes are looked up once
+            shared = Counter()
+            update = shared.update
+            index_get = self._ngram_index.get
+            for gram in title_ngrams:
+                update(index_get(gram, ()))
+
+            seen_titles = self.seen_titles
+            size = len(title_ngrams)
+            threshold = self.similarity_threshold
+            first_id = self._next_id - len(seen_titles)
+            # History order, so the first match is the same as a linear scan
+            for title_id in sorted(shared):
+                if title_id < first_id:
+                    continue  # evicted
+                original_title, ngrams = seen_titles[title_id - first_id]
+                other = len(ngrams)
+                # Jaccard <= min(|A|, |B|) / max(|A|, |B|)
+                if min(size, other) < threshold * max(size, other):
+                    continue
+                common = shared[title_id]
+                similarity = common / (size + other - common)
+
+                if similarity >= threshold:
                     logger.info(
                         f"Fuzzy match ({similarity:.2f}): "
                         f"'{title[:40]}...' ~ '{original_title[:40]}...'"
@@ -270,7 +367,7 @@ class ContentDeduplicator:
                     )
 
         # Not a duplicate - save for future checks
-        self._add_to_history(title, url, url_normalized, content_hash)
+        self._add_to_history(title, url, url_normalized, content_hash, title_ngrams)
 
         return DuplicateResult(
             is_duplicate=False,
@@ -278,23 +375,45 @@ class ContentDeduplicator:
         )
 
     def _add_to_history(
-        self, title: str, url: str, url_normalized: str, content_hash: str
+        self,
+        title: str,
+        url: str,
+        url_normalized: str,
+        content_hash: bytes,
+        title_ngrams: Optional[Set[str]] = None,
     ):
         """Add item to history, respecting max_history limit."""
         if url_normalized:
-            self.seen_urls.add(url_normalized)
+            self.seen_urls.add(hash(url_normalized))
 
         self.seen_hashes.add(content_hash)
 
-        normalized_title = self.normalize_text(title)
-        self.seen_titles.append((title, normalized_title))
-
-        # Trim history if needed
-        if len(self.seen_titles) > self.max_history:
-            # Keep the most recent half
-            keep_count = self.max_history // 2
-            self.seen_titles = self.seen_titles[-keep_count:]
-            logger.info(f"Trimmed title history to {keep_count} items")
+        if title_ngrams is None:
+            title_ngrams = self.get_ngrams(title)
+        if len(self.seen_titles) == self.max_history:
+            self._evicted += 1  # append below drops the oldest title
+        self._index_title(self._next_id, title_ngrams)
+        self.seen_titles.append((title, frozenset(title_ngrams)))
+        self._next_id += 1
+
+        # Drop evicted ids from the index once per max_history evictions
+        if self._evicted >= self.max_history:
+            self._rebuild_index()
+
+    def _index_title(self, title_id: int, ngrams: Set[str]):
+        """Add a history title's n-grams to the inverted index."""
+        index = self._ngram_index
+        for gram in ngrams:
+            index[gram].append(title_id)
+
+    def _rebuild_index(self):
+        """Re-number history titles from 0 and rebuild the index without evicted ids."""
+        self._ngram_index.clear()
+        for title_id, (_, ngrams) in enumerate(self.seen_titles):
+            self._index_title(title_id, ngrams)
+        self._next_id = len(self.seen_titles)
+        self._evicted = 0
+        logger.debug(f"Rebuilt title index ({self._next_id} items)")
 
     def add_existing(
         self, title: str, url: str, content: Optional[str] = None
@@ -302,9 +421,15 @@ class ContentDeduplicator:
         """
         Add an existing item to the deduplicator without checking.
         Useful for loading existing posts from database.
+
+        Items already in history are skipped, so the scheduler can reload
+        recent titles into the shared instance every run without
+        re-normalizing them or growing the fuzzy-match history.
         """
-        url_normalized = self.normalize_url(url)
         content_hash = self.compute_hash(title, url, content)
+        if content_hash in self.seen_hashes:
+            return
+        url_normalized = self.normalize_url(url)
         self._add_to_history(title, url, url_normalized, content_hash)
 
     def get_stats(self) -> dict:
@@ -323,6 +448,9 @@ class ContentDeduplicator:
         self.seen_hashes.clear()
         self.seen_urls.clear()
         self.seen_titles.clear()
+        self._ngram_index.clear()
+        self._next_id = 0
+        self._evicted = 0
         logger.info("Deduplicator history cleared")
 
 
@@ -1,15 +1,21 @@
 """Генератор изображений через GPT Image 1 (KLYMO Business Pivot)."""
 
 import base64
+import hashlib
 import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
-from openai import OpenAI
+from typing import Dict, List, Optional, Sequence, Tuple
+
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from src.config import get_settings
 from src.config_loader import get_image_template
 from src.logger import get_logger
+from src.rate_limiter import RateLimiter
 
 logger = get_logger(__name__)
 
@@ -25,6 +31,20 @@ KLYMO_VISUAL_STYLE = (
     "Square 1024x1024, centered composition."
 )
 
+# Максимум картинок в одном запросе images.generate (параметр n)
+MAX_IMAGES_PER_REQUEST = 10
+# Параллельные запросы для разных промптов
+IMAGE_WORKERS = 4
+# Пауза для всех запросов после 429, до повтора через tenacity
+RATE_LIMIT_PENALTY = 5.0
+# Генерация идёт десятки секунд: держим соединение дольше 5 с по умолчанию,
+# чтобы следующий запрос не платил за TCP+TLS заново
+KEEPALIVE_EXPIRY = 60.0
+# Сгенерированные картинки; img_*.png — кэш по промпту, post_*.png — ссылки на него
+IMAGES_DIR = Path("data/images")
+# Картинки кэша, не использованные дольше этого, удаляются
+IMAGE_CACHE_DAYS = 30
+
 
 class ImageGenerator:
     """Генератор изображений через OpenAI GPT Image 1 Mini."""
@@ -33,14 +53,101 @@ class ImageGenerator:
         settings = get_settings()
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY не установлен в .env")
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self._api_key = settings.openai_api_key
+        # Клиент создаётся при первой генерации: импорт openai занимает
+        # сотни мс, а при OG-картинке он не нужен вовсе
+        self._client = None
+        self._http = None
+        self._client_lock = threading.Lock()
+        # Лимит картинок в минуту: ждём заранее, а не ловим 429
+        self._limiter = RateLimiter(rate=settings.openai_image_rpm, per=60.0)
         self.model = "gpt-image-1"  # GPT Image 1 Mini
         self.quality = "medium"
         self.size = "1024x1024"
-        self.output_dir = Path("data/images")
+        self.output_dir = IMAGES_DIR
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def client(self):
+        """Клиент OpenAI с долгоживущим пулом соединений."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import httpx
+                    from openai import OpenAI
+
+                    self._http = httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=IMAGE_WORKERS * 2,
+                            max_keepalive_connections=IMAGE_WORKERS,
+                            keepalive_expiry=KEEPALIVE_EXPIRY,
+                        ),
+                        timeout=httpx.Timeout(600.0, connect=5.0),  # как у OpenAI по умолчанию
+                    )
+                    self._client = OpenAI(api_key=self._api_key, http_client=self._http)
+        return self._client
+
+    def close(self):
+        """Закрыть пул соединений."""
+        if self._http is not None:
+            self._http.close()
+
+    def __enter__(self) -> "ImageGenerator":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=2, max=30))
+    def _request_images(self, prompt: str, n: int = 1) -> List[str]:
+        """Один запрос к API: n картинок по готовому промпту, base64 каждой."""
+        from openai import RateLimitError
+
+        waited = sum(self._limiter.acquire() for _ in range(n))
+        if waited > 0:
+            logger.debug(f"Ждали лимит OpenAI {waited:.1f} с")
+        try:
+            response = self.client.images.generate(
+                model=self.model,
+                prompt=prompt,
+                n=n,
+                size=self.size,
+                quality=self.quality
+            )
+        except RateLimitError:
+            self._limiter.penalize(RATE_LIMIT_PENALTY)
+            raise
+        # По умолчанию возвращается b64_json
+        return [item.b64_json for item in response.data]
+
+    def _cache_path(self, prompt: str, variant: int = 0) -> Path:
+        """
+        Файл картинки для полного промпта: имя — стабильный хэш промпта и параметров.
+
+        variant различает картинки одного промпта из запроса с n > 1.
+        """
+        key = f"{self.model}|{self.size}|{self.quality}|{variant}|{prompt}"
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+        return self.output_dir / f"img_{digest}.png"
+
+    def _named(self, cached: Path, filename: Optional[str]) -> str:
+        """Путь к картинке под нужным именем: жёсткая ссылка на файл из кэша."""
+        cached.touch()  # очистка кэша удаляет давно не использованные файлы
+        if not filename:
+            return str(cached)
+        filepath = self.output_dir / f"{filename}.png"
+        filepath.unlink(missing_ok=True)
+        try:
+            os.link(cached, filepath)
+        except OSError:
+            shutil.copyfile(cached, filepath)
+        return str(filepath)
+
+    def _save(self, b64_json: str, filepath: Path):
+        """Декодировать base64 и сохранить PNG."""
+        filepath.write_bytes(base64.b64decode(b64_json))
+        logger.info(f"Изображение сохранено: {filepath}")
+
     def generate(
         self,
         prompt: str,
@@ -61,33 +168,75 @@ class ImageGenerator:
         # Строим промпт: KLYMO стиль + описание сцены от Claude
         prompt = f"{KLYMO_VISUAL_STYLE}\n\nScene: {prompt}"
 
+        # Тот же промпт уже генерировали — запрос к API не нужен
+        cached = self._cache_path(prompt)
+        if cached.exists():
+            logger.info(f"Изображение из кэша: {cached}")
+            return self._named(cached, filename)
+
         logger.info(f"Генерирую изображение: {prompt[:100]}...")
 
         try:
-            response = self.client.images.generate(
-                model=self.model,
-                prompt=prompt,
-                size=self.size,
-                quality=self.quality
-            )
+            self._save(self._request_images(prompt)[0], cached)
+            return self._named(cached, filename)
 
-            # Декодируем base64 (по умолчанию возвращается b64_json)
-            image_data = base64.b64decode(response.data[0].b64_json)
+        except Exception as e:
+            logger.error(f"Ошибка генерации изображения: {e}")
+            raise
 
-            # Сохраняем
-            if not filename:
-                filename = f"img_{hash(prompt) % 100000}"
-            filepath = self.output_dir / f"{filename}.png"
+    def generate_many(
+        self,
+        prompts: Sequence[str],
+        category: Optional[str] = None,
+        filenames: Optional[Sequence[Optional[str]]] = None,
+        max_workers: int = IMAGE_WORKERS,
+    ) -> List[Optional[str]]:
+        """
+        Сгенерировать несколько изображений за минимум запросов.
 
-            with open(filepath, "wb") as f:
-                f.write(image_data)
+        Одинаковые промпты уходят одним запросом с n=len(prompts)
+        (до MAX_IMAGES_PER_REQUEST), разные — параллельно, не больше
+        max_workers запросов одновременно.
 
-            logger.info(f"Изображение сохранено: {filepath}")
-            return str(filepath)
+        Args:
+            prompts: Промпты для генерации
+            category: Рубрика
+            filenames: Имена файлов (без расширения), по одному на промпт
 
-        except Exception as e:
-            logger.error(f"Ошибка генерации изображения: {e}")
-            raise
+        Returns:
+            Пути к файлам в порядке prompts, None там, где генерация не удалась
+        """
+        if not prompts:
+            return []
+        filenames = list(filenames) if filenames else [None] * len(prompts)
+
+        if len(set(prompts)) == 1 and len(prompts) <= MAX_IMAGES_PER_REQUEST:
+            prompt = f"{KLYMO_VISUAL_STYLE}\n\nScene: {prompts[0]}"
+            cached = [self._cache_path(prompt, i) for i in range(len(prompts))]
+            missing = [path for path in cached if not path.exists()]
+            if missing:
+                logger.info(f"Генерирую {len(missing)} изображений одним запросом: {prompt[:100]}...")
+                try:
+                    images = self._request_images(prompt, n=len(missing))
+                except Exception as e:
+                    logger.error(f"Ошибка генерации изображений: {e}")
+                    return [None] * len(prompts)
+                for b64_json, path in zip(images, missing):
+                    self._save(b64_json, path)
+            return [
+                self._named(path, filename) if path.exists() else None
+                for path, filename in zip(cached, filenames)
+            ]
+
+        def generate_one(prompt: str, filename: Optional[str]) -> Optional[str]:
+            try:
+                return self.generate(prompt, category, filename)
+            except Exception:
+                return None  # Уже залогировано в generate
+
+        workers = max(1, min(max_workers, len(prompts)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(generate_one, prompts, filenames))
 
     def generate_for_post(
         self,
@@ -99,6 +248,19 @@ class ImageGenerator:
         filename = f"post_{post_id}"
         return self.generate(image_prompt, category, filename)
 
+    def generate_for_posts(
+        self,
+        posts: Sequence[Tuple[int, str]],
+        category: Optional[str] = None
+    ) -> Dict[int, Optional[str]]:
+        """Сгенерировать изображения для нескольких постов: {post_id: путь или None}."""
+        paths = self.generate_many(
+            [prompt for _, prompt in posts],
+            category,
+            [f"post_{post_id}" for post_id, _ in posts],
+        )
+        return {post_id: path for (post_id, _), path in zip(posts, paths)}
+
     def choose_image_strategy(
         self,
         og_image_url: Optional[str],
@@ -122,20 +284,14 @@ class ImageGenerator:
         """
         MIN_IMAGE_SIZE_KB = 15  # Картинки <15KB — скорее всего placeholder/иконка
 
-        # Step 1: Пробуем OG-картинку из статьи
+        # Step 1: Пробуем OG-картинку из статьи (мелкие картинки отбрасываются)
         if og_image_url and og_image_url.startswith(("http://", "https://")):
             try:
-                from og_parser import download_image
-                local_path = download_image(og_image_url)
+                from og_parser import download_image_if_large
+                local_path = download_image_if_large(og_image_url, MIN_IMAGE_SIZE_KB)
                 if local_path:
-                    # Проверяем размер — мелкие картинки отбрасываем
-                    file_size_kb = os.path.getsize(local_path) / 1024
-                    if file_size_kb >= MIN_IMAGE_SIZE_KB:
-                        logger.info(f"Using OG image ({file_size_kb:.0f}KB): {local_path}")
-                        return (local_path, "og")
-                    else:
-                        logger.info(f"OG image too small ({file_size_kb:.0f}KB), skipping")
-                        os.remove(local_path)
+                    logger.info(f"Using OG image: {local_path}")
+                    return (local_path, "og")
             except Exception as e:
                 logger.warning(f"Failed to download OG image: {e}")
 
@@ -153,6 +309,33 @@ class ImageGenerator:
         return (None, "none")
 
 
+def cleanup_image_cache(days: int = IMAGE_CACHE_DAYS, image_dir: Optional[Path] = None) -> int:
+    """
+    Удалить картинки кэша (img_*.png), не использованные дольше days дней.
+
+    Файлы постов (post_*.png) — жёсткие ссылки, они остаются.
+
+    Args:
+        days: Сколько дней хранить неиспользуемую картинку
+        image_dir: Папка с картинками (по умолчанию IMAGES_DIR)
+
+    Returns:
+        Число удалённых файлов
+    """
+    cutoff = time.time() - days * 86400
+    removed = 0
+    for path in Path(image_dir or IMAGES_DIR).glob("img_*.png"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue  # Удалён параллельно
+    if removed:
+        logger.info(f"Удалено {removed} картинок из кэша старше {days} дней")
+    return removed
+
+
 # Singleton
 _generator: Optional[ImageGenerator] = None
 
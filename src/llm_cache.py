@@ -0,0 +1,196 @@
+"""SQLite cache for LLM responses (digests) keyed by prompt hash or article set."""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
+
+from database import Database
+from logger import get_logger
+
+logger = get_logger("news_bot.llm_cache")
+
+
+class LLMCache:
+    """
+    Cache Claude responses for near-identical inputs.
+
+    Two lookups:
+    - exact: response for a byte-identical prompt (retries, restarts, re-runs)
+    - similar: a digest for a set of articles is reused when a new request
+      covers (almost) the same articles: similarity is the Jaccard coefficient
+      of the normalized article URLs, same metric the deduplicator uses for titles.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/news_bot.db",
+        ttl_hours: int = 6,
+        similarity_threshold: float = 0.92,
+        prompt_ttl_days: int = 7,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            db_path: Path to SQLite database
+            ttl_hours: Similar-set responses older than this are ignored
+            similarity_threshold: Minimum article-set similarity for a hit (0.0-1.0)
+            prompt_ttl_days: Exact-prompt responses older than this are ignored
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_hours = ttl_hours
+        self.similarity_threshold = similarity_threshold
+        self.prompt_ttl_days = prompt_ttl_days
+        self._init_tables()
+
+    def _init_tables(self):
+        """Create llm_cache tables if not exist."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    article_keys TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_llm_cache_kind_created
+                ON llm_cache(kind, created_at)
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_prompt_cache (
+                    prompt_hash TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+
+    @staticmethod
+    def prompt_hash(
+        model: str,
+        prompt: Union[str, List[Dict]],
+        system: Optional[Union[str, List[Dict]]] = None,
+    ) -> str:
+        """
+        Stable hash of model + system prompt + user prompt.
+
+        Args:
+            model: Model name (same prompt on another model is a different entry)
+            prompt: Prompt text or list of content blocks
+            system: System prompt, if any
+
+        Returns:
+            Hex digest
+        """
+        payload = json.dumps([model, system, prompt], ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, prompt_hash: str) -> Optional[str]:
+        """Cached response for an identical prompt, or None."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                """SELECT response FROM llm_prompt_cache
+                WHERE prompt_hash = ? AND created_at > datetime('now', '-' || ? || ' days')""",
+                (prompt_hash, self.prompt_ttl_days),
+            )
+            row = cursor.fetchone()
+
+        if row:
+            logger.info("LLM cache hit (exact prompt)")
+            return row[0]
+        return None
+
+    def put(self, prompt_hash: str, response: str):
+        """Save response for a prompt hash."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "DELETE FROM llm_prompt_cache WHERE created_at < datetime('now', '-' || ? || ' days')",
+                (self.prompt_ttl_days,),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_prompt_cache (prompt_hash, response) VALUES (?, ?)",
+                (prompt_hash, response),
+            )
+            conn.commit()
+
+    @staticmethod
+    def article_keys(articles: List[Dict]) -> Set[str]:
+        """Normalized article URLs used as the cache key set."""
+        return {
+            Database.normalize_url(a.get("link", ""))
+            for a in articles
+            if a.get("link")
+        }
+
+    def find_similar(self, kind: str, articles: List[Dict]) -> Optional[str]:
+        """
+        Find a cached response for a similar article set.
+
+        Args:
+            kind: Response type (e.g. 'digest')
+            articles: Articles the response would be generated from
+
+        Returns:
+            Cached response or None
+        """
+        keys = self.article_keys(articles)
+        if not keys:
+            return None
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                """SELECT article_keys, response FROM llm_cache
+                WHERE kind = ? AND created_at > datetime('now', '-' || ? || ' hours')
+                ORDER BY created_at DESC""",
+                (kind, self.ttl_hours),
+            )
+            rows = cursor.fetchall()
+
+        best_score, best_response = 0.0, None
+        for keys_json, response in rows:
+            cached_keys = set(json.loads(keys_json))
+            union = len(keys | cached_keys)
+            score = len(keys & cached_keys) / union if union else 0.0
+            if score > best_score:
+                best_score, best_response = score, response
+
+        if best_score >= self.similarity_threshold:
+            logger.info(f"LLM cache hit ({kind}, similarity {best_score:.2f})")
+            return best_response
+        return None
+
+    def store(self, kind: str, articles: List[Dict], response: str):
+        """Save response for an article set."""
+        keys = sorted(self.article_keys(articles))
+        if not keys:
+            return
+
+        with sqlite3.connect(self.db_path) as conn:
+            # Expired entries are never read again, drop them on write
+            conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < datetime('now', '-' || ? || ' hours')",
+                (self.ttl_hours,),
+            )
+            conn.execute(
+                "INSERT INTO llm_cache (kind, article_keys, response) VALUES (?, ?, ?)",
+                (kind, json.dumps(keys), response),
+            )
+            conn.commit()
+
+
+# Singleton instance
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Get or create LLM cache singleton."""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
@@ -1,15 +1,21 @@
 """Parse Open Graph images from article pages."""
 
+import hashlib
 import os
 import re
+import sqlite3
 import tempfile
+import threading
+from contextlib import closing
+from functools import lru_cache
 from io import BytesIO
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from PIL import Image
+from requests.adapters import HTTPAdapter
 
 from logger import get_logger
 
@@ -21,15 +27,118 @@ HEADERS = {
                   "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
+# Enrichment workers share one session: keep-alive connections are reused
+# across articles from the same site instead of a new TCP+TLS handshake each
+ENRICH_WORKERS = 8
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=ENRICH_WORKERS * 2)
+_session = requests.Session()
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+_session.headers.update(HEADERS)
+
+# Image downloads: 64 KB reads, a typical OG image is a handful of chunks
+DOWNLOAD_CHUNK_SIZE = 65536
+
+# C-based parser backend for BeautifulSoup (much faster than html.parser)
+HTML_PARSER = "lxml"
+
+# Only <meta> tags are needed for og:image / twitter:image lookups
+_META_ONLY = SoupStrainer("meta")
+
+# og:/twitter: meta tags live in <head>: stop downloading once it's closed
+HEAD_CHUNK_SIZE = 4096
+MAX_HEAD_BYTES = 65536
+# Cap for the article <img> fallback, which needs the body
+MAX_PAGE_BYTES = 1024 * 1024
+
+# Persistent URL -> og:image cache (article pages rarely change their image),
+# stored in the bot database (settings.db_path); the default is used when
+# settings aren't configured (tests, standalone scripts)
+OG_CACHE_DB_PATH = "data/news_bot.db"
+OG_CACHE_TTL_DAYS = 7
+_og_cache_ready = set()  # db paths whose og_cache table exists
+_og_cache_lock = threading.Lock()
+
 # Minimum image dimensions for quality check
 MIN_WIDTH = 800
 MIN_HEIGHT = 600
 
 
+@lru_cache(maxsize=1)
+def _og_cache_db_path() -> str:
+    """Bot database path from settings, OG_CACHE_DB_PATH if settings are unavailable."""
+    try:
+        from config import get_settings
+        return str(get_settings().db_path)
+    except (ImportError, ValueError):
+        return OG_CACHE_DB_PATH
+
+
+def _og_cache_connect() -> sqlite3.Connection:
+    """Open og_cache database; the table is created once per database file."""
+    db_path = _og_cache_db_path()
+    if db_path not in _og_cache_ready:
+        with _og_cache_lock:
+            if db_path not in _og_cache_ready:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                with closing(sqlite3.connect(db_path)) as conn, conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS og_cache (
+                            url_sha256 TEXT PRIMARY KEY,
+                            og_url TEXT,
+                            fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """)
+                _og_cache_ready.add(db_path)
+    return sqlite3.connect(db_path)
+
+
+def _og_cache_key(url: str) -> str:
+    """Cache key for a page URL."""
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def _og_cache_get(url: str) -> Tuple[bool, Optional[str]]:
+    """
+    Look up cached og:image for a page.
+
+    Returns:
+        (found, image_url) — image_url may be None for pages without image
+    """
+    try:
+        with closing(_og_cache_connect()) as conn:
+            row = conn.execute(
+                """SELECT og_url FROM og_cache
+                WHERE url_sha256 = ?
+                AND fetched_at > datetime('now', '-' || ? || ' days')""",
+                (_og_cache_key(url), OG_CACHE_TTL_DAYS),
+            ).fetchone()
+        return (True, row[0]) if row else (False, None)
+    except sqlite3.Error as e:
+        logger.warning(f"og_cache lookup failed: {e}")
+        return (False, None)
+
+
+def _og_cache_put(url: str, image_url: Optional[str]) -> None:
+    """Save og:image (or its absence) for a page."""
+    try:
+        with closing(_og_cache_connect()) as conn, conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO og_cache (url_sha256, og_url, fetched_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)""",
+                (_og_cache_key(url), image_url),
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"og_cache write failed: {e}")
+
+
 def fetch_og_image(url: str, timeout: int = 10) -> Optional[str]:
     """
     Fetch og:image URL from an article page.
 
+    Results are cached per page URL for OG_CACHE_TTL_DAYS; failed
+    requests are not cached so they are retried next time.
+
     Args:
         url: Article URL to parse
         timeout: Request timeout in seconds
@@ -40,44 +149,13 @@ def fetch_og_image(url: str, timeout: int = 10) -> Optional[str]:
     if not url:
         return None
 
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=timeout)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Try og:image first (most common)
-        og_image = soup.find("meta", property="og:image")
-        if og_image and og_image.get("content"):
-            image_url = og_image["content"]
-            # Handle relative URLs
-            if not image_url.startswith(("http://", "https://")):
-                image_url = urljoin(url, image_url)
-            logger.debug(f"Found og:image: {image_url}")
-            return image_url
-
-        # Try twitter:image as fallback
-        twitter_image = soup.find("meta", attrs={"name": "twitter:image"})
-        if twitter_image and twitter_image.get("content"):
-            image_url = twitter_image["content"]
-            if not image_url.startswith(("http://", "https://")):
-                image_url = urljoin(url, image_url)
-            logger.debug(f"Found twitter:image: {image_url}")
-            return image_url
-
-        # Try first large image in article as last resort
-        article = soup.find("article") or soup.find("main") or soup
-        for img in article.find_all("img", src=True):
-            src = img.get("src") or img.get("data-src")
-            if src and not _is_icon_or_logo(src):
-                if not src.startswith(("http://", "https://")):
-                    src = urljoin(url, src)
-                logger.debug(f"Found article image: {src}")
-                return src
-
-        logger.debug(f"No og:image found for {url}")
-        return None
+    found, image_url = _og_cache_get(url)
+    if found:
+        logger.debug(f"og:image cache hit for {url}")
+        return image_url
 
+    try:
+        image_url = _parse_og_image(url, timeout)
     except requests.RequestException as e:
         logger.warning(f"Failed to fetch og:image from {url}: {e}")
         return None
@@ -85,6 +163,80 @@ def fetch_og_image(url: str, timeout: int = 10) -> Optional[str]:
         logger.error(f"Error parsing og:image from {url}: {e}")
         return None
 
+    _og_cache_put(url, image_url)
+    return image_url
+
+
+def _parse_og_image(url: str, timeout: int) -> Optional[str]:
+    """Download page and extract og:image / twitter:image / first article image."""
+    with _session.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(HEAD_CHUNK_SIZE)
+        head = _read_head(chunks)
+
+        image_url = _find_meta_image(url, head)
+        if image_url:
+            return image_url
+
+        # Article image fallback needs the rest of the page
+        page = bytearray(head)
+        for chunk in chunks:
+            page += chunk
+            if len(page) >= MAX_PAGE_BYTES:
+                break
+
+    # Try first large image in article as last resort (full parse)
+    soup = BeautifulSoup(bytes(page), HTML_PARSER)
+    article = soup.find("article") or soup.find("main") or soup
+    for img in article.find_all("img", src=True):
+        src = img.get("src") or img.get("data-src")
+        if src and not _is_icon_or_logo(src):
+            if not src.startswith(("http://", "https://")):
+                src = urljoin(url, src)
+            logger.debug(f"Found article image: {src}")
+            return src
+
+    logger.debug(f"No og:image found for {url}")
+    return None
+
+
+def _read_head(chunks) -> bytes:
+    """Read response chunks until </head> is seen or MAX_HEAD_BYTES is reached."""
+    buf = bytearray()
+    for chunk in chunks:
+        start = max(0, len(buf) - len(b"</head>"))
+        buf += chunk
+        if b"</head>" in buf[start:].lower() or len(buf) >= MAX_HEAD_BYTES:
+            break
+    return bytes(buf)
+
+
+def _find_meta_image(url: str, html: bytes) -> Optional[str]:
+    """Extract og:image / twitter:image from <meta> tags."""
+    # Fast path: build a tree of <meta> tags only
+    meta = BeautifulSoup(html, HTML_PARSER, parse_only=_META_ONLY)
+
+    # Try og:image first (most common)
+    og_image = meta.find("meta", property="og:image")
+    if og_image and og_image.get("content"):
+        image_url = og_image["content"]
+        # Handle relative URLs
+        if not image_url.startswith(("http://", "https://")):
+            image_url = urljoin(url, image_url)
+        logger.debug(f"Found og:image: {image_url}")
+        return image_url
+
+    # Try twitter:image as fallback
+    twitter_image = meta.find("meta", attrs={"name": "twitter:image"})
+    if twitter_image and twitter_image.get("content"):
+        image_url = twitter_image["content"]
+        if not image_url.startswith(("http://", "https://")):
+            image_url = urljoin(url, image_url)
+        logger.debug(f"Found twitter:image: {image_url}")
+        return image_url
+
+    return None
+
 
 def _is_icon_or_logo(url: str) -> bool:
     """Check if URL is likely an icon or logo (not a real article image)."""
@@ -117,7 +269,7 @@ def check_image_quality(image_url: str, min_width: int = 800, min_height: int =
         return {"is_valid": False, "reason": "No image URL provided"}
 
     try:
-        response = requests.get(image_url, headers=HEADERS, timeout=10, stream=True)
+        response = _session.get(image_url, timeout=10, stream=True)
         response.raise_for_status()
 
         # Проверка размера файла (не больше 10MB)
@@ -159,7 +311,9 @@ def check_image_quality(image_url: str, min_width: int = 800, min_height: int =
         return {"is_valid": False, "reason": f"Error: {e}"}
 
 
-def download_image(image_url: str, save_dir: str = None, timeout: int = 15) -> Optional[str]:
+def download_image(
+    image_url: str, save_dir: str = None, timeout: int = 15, min_bytes: int = 0
+) -> Optional[str]:
     """
     Download image from URL and save locally.
 
@@ -167,9 +321,10 @@ def download_image(image_url: str, save_dir: str = None, timeout: int = 15) -> O
         image_url: URL of image to download
         save_dir: Directory to save image (default: data/images)
         timeout: Request timeout
+        min_bytes: Skip the body if Content-Length says it is smaller than this
 
     Returns:
-        Path to saved image or None if failed
+        Path to saved image or None if failed or too small
     """
     if not image_url:
         return None
@@ -185,9 +340,16 @@ def download_image(image_url: str, save_dir: str = None, timeout: int = 15) -> O
     os.makedirs(save_dir, exist_ok=True)
 
     try:
-        response = requests.get(image_url, headers=HEADERS, timeout=timeout, stream=True)
+        response = _session.get(image_url, timeout=timeout, stream=True)
         response.raise_for_status()
 
+        # Headers are in, body is not: drop placeholders before reading it
+        content_length = int(response.headers.get("Content-Length") or 0)
+        if 0 < content_length < min_bytes:
+            response.close()
+            logger.info(f"Image too small ({content_length / 1024:.0f}KB), skipping download")
+            return None
+
         # Determine file extension from content-type or URL
         content_type = response.headers.get("Content-Type", "")
         if "jpeg" in content_type or "jpg" in content_type:
@@ -212,14 +374,13 @@ def download_image(image_url: str, save_dir: str = None, timeout: int = 15) -> O
                 ext = ".jpg"  # Default
 
         # Generate unique filename
-        import hashlib
         url_hash = hashlib.md5(image_url.encode()).hexdigest()[:12]
         filename = f"og_{url_hash}{ext}"
         filepath = os.path.join(save_dir, filename)
 
         # Save image
         with open(filepath, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 f.write(chunk)
 
         logger.info(f"Downloaded image: {filepath}")
@@ -233,6 +394,34 @@ def download_image(image_url: str, save_dir: str = None, timeout: int = 15) -> O
         return None
 
 
+def download_image_if_large(image_url: str, min_size_kb: float = 15) -> Optional[str]:
+    """
+    Download image and keep it only if the file is big enough.
+
+    Small files are usually placeholders or icons.
+
+    Args:
+        image_url: URL of image to download
+        min_size_kb: Minimum file size to keep
+
+    Returns:
+        Path to saved image or None if download failed or file is too small
+    """
+    # Content-Length rejects most small files before the body is read;
+    # the size check below covers responses without it
+    local_path = download_image(image_url, min_bytes=int(min_size_kb * 1024))
+    if not local_path:
+        return None
+
+    file_size_kb = os.path.getsize(local_path) / 1024
+    if file_size_kb < min_size_kb:
+        logger.info(f"OG image too small ({file_size_kb:.0f}KB), skipping")
+        os.remove(local_path)
+        return None
+
+    return local_path
+
+
 def enrich_article_with_image(article: Dict) -> Dict:
     """
     Add image_url to article if not already present.
@@ -262,7 +451,7 @@ def enrich_article_with_image(article: Dict) -> Dict:
     return article
 
 
-def enrich_articles_batch(articles: list, max_workers: int = 5) -> list:
+def enrich_articles_batch(articles: list, max_workers: int = ENRICH_WORKERS) -> list:
     """
     Enrich multiple articles with images in parallel.
 
@@ -1,6 +1,8 @@
 """SQLite queue for scheduled posts."""
 
 import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -13,6 +15,13 @@ logger = get_logger("news_bot.post_queue")
 class PostQueue:
     """SQLite-based queue for scheduled posts."""
 
+    # Pending-post counter shared by all instances in this process, per db:
+    # {db_path: (count, loaded_at)}. Lets the publish job skip SQLite when
+    # nothing is queued. Writes from other processes are picked up on resync.
+    PENDING_RESYNC_SECONDS = 3600
+    _pending_counts: Dict[str, tuple] = {}
+    _pending_lock = threading.Lock()
+
     def __init__(self, db_path: str = "data/news_bot.db"):
         """Initialize post queue."""
         self.db_path = Path(db_path)
@@ -85,6 +94,7 @@ class PostQueue:
             )
             conn.commit()
             post_id = cursor.lastrowid
+            self._pending_added()
             logger.info(f"Added post to queue: id={post_id}, format={format_type}")
             return post_id
 
@@ -119,6 +129,38 @@ class PostQueue:
             )
             return cursor.fetchone()[0]
 
+    @property
+    def pending(self) -> int:
+        """
+        Cached number of pending posts (no DB access while the cache is fresh).
+
+        Returns:
+            Pending post count
+        """
+        key = str(self.db_path)
+        with self._pending_lock:
+            cached = self._pending_counts.get(key)
+        if cached and time.monotonic() - cached[1] < self.PENDING_RESYNC_SECONDS:
+            return cached[0]
+
+        count = self.get_pending_count()
+        with self._pending_lock:
+            self._pending_counts[key] = (count, time.monotonic())
+        return count
+
+    def _pending_added(self, n: int = 1):
+        """Bump cached pending count after inserting pending posts."""
+        key = str(self.db_path)
+        with self._pending_lock:
+            cached = self._pending_counts.get(key)
+            if cached:
+                self._pending_counts[key] = (cached[0] + n, cached[1])
+
+    def _pending_changed(self):
+        """Drop cached pending count after a status change; next read resyncs."""
+        with self._pending_lock:
+            self._pending_counts.pop(str(self.db_path), None)
+
     def get_posts_for_today(self) -> List[Dict]:
         """Get all posts scheduled for today."""
         today_start = datetime.now().replace(hour=0, minute=0, second=0)
@@ -174,6 +216,7 @@ class PostQueue:
                 (datetime.now().isoformat(), post_id),
             )
             conn.commit()
+            self._pending_changed()
             logger.info(f"Post {post_id} marked as published")
             return True
 
@@ -189,6 +232,7 @@ class PostQueue:
                 (error_message, post_id),
             )
             conn.commit()
+            self._pending_changed()
             logger.error(f"Post {post_id} marked as failed: {error_message}")
             return True
 
@@ -320,6 +364,7 @@ class PostQueue:
             conn.commit()
             count = cursor.rowcount
             if count > 0:
+                self._pending_added(count)
                 logger.info(f"Reset {count} failed posts to pending")
             return count
 
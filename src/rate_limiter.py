@@ -0,0 +1,74 @@
+"""Thread-safe token-bucket rate limiter for outgoing API calls."""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket: allows `rate` calls per `per` seconds, with bursts up to `rate`.
+
+    acquire() blocks until a token is available, so callers stay under
+    the API limit instead of hitting 429 and backing off.
+    """
+
+    def __init__(self, rate: int, per: float = 1.0):
+        """
+        Initialize limiter.
+
+        Args:
+            rate: Number of calls allowed per period
+            per: Period length in seconds
+        """
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping if the bucket is empty.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                delay = (1 - self._tokens) * self.per / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def reserve(self) -> float:
+        """
+        Take one token without blocking, going into debt if the bucket is empty.
+
+        Lets async callers wait with asyncio.sleep instead of time.sleep.
+
+        Returns:
+            Seconds to wait before the token may be used
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0.0, -self._tokens * self.per / self.rate)
+
+    def _refill(self):
+        """Add tokens for the time since the last update (caller holds the lock)."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.rate, self._tokens + elapsed * self.rate / self.per)
+
+    def penalize(self, seconds: float):
+        """Empty the bucket and hold the next token back for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate / self.per
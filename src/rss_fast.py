@@ -0,0 +1,145 @@
+"""Fast RSS/Atom extractor on top of lxml (feedparser is the fallback)."""
+
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from typing import Dict, List, Optional
+
+from lxml import etree
+
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+SKIP_IMAGE_PATTERNS = ("pixel", "tracking", "icon", "logo", "1x1")
+
+_IMG_SRC_RE = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']')
+
+
+def image_from_html(html_content: str) -> Optional[str]:
+    """First <img> URL in HTML that isn't a tracking pixel or icon."""
+    if not html_content:
+        return None
+    img_match = _IMG_SRC_RE.search(html_content)
+    if img_match:
+        url = img_match.group(1)
+        if not any(skip in url.lower() for skip in SKIP_IMAGE_PATTERNS):
+            return url
+    return None
+
+
+def _local(tag) -> str:
+    """Tag name without namespace."""
+    return etree.QName(tag).localname if isinstance(tag, str) else ""
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse RFC 822 (RSS) or ISO 8601 (Atom) date.
+
+    Returns naive UTC, same as RSSParser gets from feedparser's *_parsed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _extract_image(item) -> Optional[str]:
+    """Same lookup order as rss_parser.extract_image_from_entry."""
+    media_content = item.findall(f"{{{MEDIA_NS}}}content")
+    for media in media_content:
+        if media.get("type", "").startswith("image") or media.get("medium") == "image":
+            return media.get("url")
+    if media_content and media_content[0].get("url"):
+        url = media_content[0].get("url")
+        if any(ext in url.lower() for ext in IMAGE_EXTENSIONS):
+            return url
+
+    thumbnail = item.find(f"{{{MEDIA_NS}}}thumbnail")
+    if thumbnail is not None:
+        return thumbnail.get("url")
+
+    for child in item:
+        name = _local(child.tag)
+        if name == "enclosure" or (name == "link" and child.get("rel") == "enclosure"):
+            if child.get("type", "").startswith("image"):
+                return child.get("url") or child.get("href")
+
+    return None
+
+
+def _entry_to_dict(item) -> Dict:
+    """Extract the fields RSSParser uses from an <item> or <entry>."""
+    fields: Dict[str, str] = {}
+    link = ""
+    for child in item:
+        name = _local(child.tag)
+        if name == "link":
+            # RSS: text; Atom: href (prefer rel="alternate")
+            href = child.get("href")
+            if href is None:
+                link = link or (child.text or "").strip()
+            elif child.get("rel", "alternate") == "alternate" or not link:
+                link = href
+        elif name == "encoded" and child.tag == f"{{{CONTENT_NS}}}encoded":
+            fields["content"] = child.text or ""
+        elif name in ("title", "description", "summary", "content",
+                      "pubDate", "published", "updated", "date"):
+            fields.setdefault(name, child.text or "")
+
+    summary = fields.get("description") or fields.get("summary") or fields.get("content", "")
+    published = _parse_date(
+        fields.get("pubDate") or fields.get("published")
+        or fields.get("date") or fields.get("updated")
+    )
+
+    image_url = _extract_image(item)
+    if not image_url:
+        image_url = image_from_html(fields.get("content", "")) or image_from_html(summary)
+
+    return {
+        "title": (fields.get("title") or "").strip() or "No title",
+        "link": link,
+        "summary": summary,
+        "published": published,
+        "image_url": image_url,
+    }
+
+
+def parse_feed(content: bytes) -> List[Dict]:
+    """
+    Stream-parse RSS 2.0 / RSS 1.0 / Atom document.
+
+    Only the fields RSSParser needs are extracted, and each element is
+    cleared after use so memory stays flat on large feeds.
+
+    Args:
+        content: Raw feed bytes
+
+    Returns:
+        List of entries: title, link, summary, published (datetime or None), image_url
+
+    Raises:
+        lxml.etree.XMLSyntaxError: Document is not well-formed XML
+    """
+    entries = []
+    for _, elem in etree.iterparse(
+        BytesIO(content), events=("end",), tag=("{*}item", "{*}entry"),
+        resolve_entities=False, huge_tree=True,
+    ):
+        entries.append(_entry_to_dict(elem))
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    return entries
@@ -1,14 +1,18 @@
 """RSS feed parser for collecting AI news."""
 
 import json
-import re
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from pathlib import Path
 from time import mktime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import feedparser
 import requests
+from lxml import etree
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -16,6 +20,7 @@ from tenacity import (
     wait_exponential,
 )
 
+import rss_fast
 from logger import get_logger
 
 logger = get_logger("news_bot.rss")
@@ -63,18 +68,102 @@ def extract_image_from_entry(entry) -> Optional[str]:
     summary = entry.get("summary", "")
 
     for html_content in [content, summary]:
-        if html_content:
-            # Find img tags
-            img_match = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', html_content)
-            if img_match:
-                url = img_match.group(1)
-                # Skip tracking pixels and icons
-                if not any(skip in url.lower() for skip in ["pixel", "tracking", "icon", "logo", "1x1"]):
-                    return url
+        # Skips tracking pixels and icons
+        url = rss_fast.image_from_html(html_content)
+        if url:
+            return url
 
     return None
 
 
+def parse_entry_date(entry) -> Optional[datetime]:
+    """Parse publication date from feed entry."""
+    if hasattr(entry, "published_parsed") and entry.published_parsed:
+        return datetime.fromtimestamp(mktime(entry.published_parsed))
+    elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
+        return datetime.fromtimestamp(mktime(entry.updated_parsed))
+    return None
+
+
+# Parser processes are started once and reused: starting them on every
+# fetch costs more than parsing a few dozen small feeds
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_workers = 0
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared parser process pool with at least `workers` processes."""
+    global _parse_pool, _parse_pool_workers
+    with _parse_pool_lock:
+        if _parse_pool is None or _parse_pool_workers < workers:
+            if _parse_pool is not None:
+                _parse_pool.shutdown(wait=False)
+            _parse_pool = ProcessPoolExecutor(max_workers=workers)
+            _parse_pool_workers = workers
+        return _parse_pool
+
+
+def _discard_parse_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next fetch starts a new one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False)
+
+
+def parse_feed_articles(content: bytes, source: str, cutoff_time: datetime) -> List[Dict]:
+    """
+    Parse raw feed bytes and extract articles newer than cutoff.
+
+    Uses the lxml extractor from rss_fast; feedparser is only used for
+    documents lxml rejects (malformed XML, HTML entities, etc.).
+    Module-level (picklable) so it can run in a worker process.
+
+    Args:
+        content: Raw RSS/Atom document
+        source: Feed name stored in each article
+        cutoff_time: Skip articles published before this time
+
+    Returns:
+        List of articles from this feed
+    """
+    try:
+        entries = rss_fast.parse_feed(content)
+    except etree.XMLSyntaxError as e:
+        logger.debug(f"lxml can't parse {source} ({e}), falling back to feedparser")
+        entries = [
+            {
+                "title": entry.get("title", "No title"),
+                "link": entry.get("link", ""),
+                "summary": entry.get("summary", ""),
+                "published": parse_entry_date(entry),
+                "image_url": extract_image_from_entry(entry),
+            }
+            for entry in feedparser.parse(content).entries
+        ]
+
+    articles = []
+    for entry in entries:
+        pub_date = entry["published"]
+
+        # Skip old articles
+        if pub_date and pub_date < cutoff_time:
+            continue
+
+        articles.append({
+            "title": entry["title"],
+            "link": entry["link"],
+            "summary": entry["summary"],
+            "published": pub_date.isoformat() if pub_date else None,
+            "source": source,
+            "image_url": entry["image_url"],  # From RSS (may be None)
+        })
+
+    return articles
+
+
 class RSSParser:
     """Parse RSS feeds and collect news articles."""
 
@@ -102,87 +191,165 @@ class RSSParser:
             f"{retry_state.outcome.exception()}"
         ),
     )
-    def _fetch_feed(self, url: str, timeout: int = 30) -> feedparser.FeedParserDict:
+    def _download_feed(self, url: str, timeout: int = 30) -> bytes:
         """
-        Fetch RSS feed with retry logic and timeout.
+        Download raw RSS feed with retry logic and timeout.
 
         Args:
             url: RSS feed URL
             timeout: Request timeout in seconds
 
         Returns:
-            Parsed feed data
+            Raw feed bytes
         """
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         }
         response = requests.get(url, headers=headers, timeout=timeout)
         response.raise_for_status()
-        return feedparser.parse(response.content)
+        return response.content
+
+    def _fetch_feed(self, url: str, timeout: int = 30) -> feedparser.FeedParserDict:
+        """
+        Fetch and parse RSS feed.
+
+        Args:
+            url: RSS feed URL
+            timeout: Request timeout in seconds
 
-    def fetch_recent_news(self, hours: int = 24) -> List[Dict]:
+        Returns:
+            Parsed feed data
+        """
+        return feedparser.parse(self._download_feed(url, timeout))
+
+    def fetch_recent_news(
+        self,
+        hours: int = 24,
+        max_workers: int = 10,
+        parse_workers: Optional[int] = None,
+    ) -> List[Dict]:
         """
         Fetch news articles from the last N hours.
 
+        Feeds are downloaded in parallel threads (network-bound), then parsed
+        in a process pool (CPU-bound, feedparser holds the GIL), so parsing
+        scales with the number of cores.
+
         Args:
             hours: Number of hours to look back
+            max_workers: Number of feeds downloaded concurrently
+            parse_workers: Number of parser processes (default: CPU count)
 
         Returns:
             List of news articles with metadata
         """
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        all_articles = []
+        enabled_feeds = [feed for feed in self.feeds if feed.get("enabled", True)]
 
-        for feed in self.feeds:
-            if not feed.get("enabled", True):
-                continue
+        downloaded = self._download_feeds(enabled_feeds, max_workers)
+        all_articles = self._parse_feeds(downloaded, cutoff_time, parse_workers)
 
-            try:
-                logger.info(f"Fetching from {feed['name']}...")
-                parsed = self._fetch_feed(feed["url"])
+        # Sort by publication date (newest first)
+        all_articles.sort(
+            key=lambda x: x["published"] if x["published"] else "", reverse=True
+        )
 
-                for entry in parsed.entries:
-                    # Parse publication date
-                    pub_date = self._parse_date(entry)
+        logger.info(f"Collected {len(all_articles)} articles")
+        return all_articles
 
-                    # Skip old articles
-                    if pub_date and pub_date < cutoff_time:
-                        continue
+    def _download_feeds(self, feeds: List[Dict], max_workers: int) -> List[Tuple[Dict, bytes]]:
+        """
+        Download feeds concurrently, skipping the ones that fail.
 
-                    # Extract image from RSS entry
-                    image_url = extract_image_from_entry(entry)
+        Args:
+            feeds: Feed config entries (name, url, ...)
+            max_workers: Number of concurrent downloads
 
-                    article = {
-                        "title": entry.get("title", "No title"),
-                        "link": entry.get("link", ""),
-                        "summary": entry.get("summary", ""),
-                        "published": pub_date.isoformat() if pub_date else None,
-                        "source": feed["name"],
-                        "image_url": image_url,  # From RSS (may be None)
-                    }
-                    all_articles.append(article)
+        Returns:
+            List of (feed, raw content) pairs
+        """
+        if not feeds:
+            return []
+
+        downloaded = []
+        workers = max(1, min(max_workers, len(feeds)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for feed in feeds:
+                logger.info(f"Fetching from {feed['name']}...")
+                futures[executor.submit(self._download_feed, feed["url"])] = feed
+
+            for future in as_completed(futures):
+                feed = futures[future]
+                try:
+                    downloaded.append((feed, future.result()))
+                except Exception as e:
+                    logger.error(f"Error fetching {feed['name']}: {e}")
+
+        return downloaded
+
+    def _parse_feeds(
+        self,
+        downloaded: List[Tuple[Dict, bytes]],
+        cutoff_time: datetime,
+        parse_workers: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Parse downloaded feeds in the shared process pool.
 
-            except Exception as e:
-                logger.error(f"Error fetching {feed['name']}: {e}")
-                continue
+        Falls back to parsing in the current process for a single feed
+        or when worker processes can't be started.
 
-        # Sort by publication date (newest first)
-        all_articles.sort(
-            key=lambda x: x["published"] if x["published"] else "", reverse=True
-        )
+        Args:
+            downloaded: List of (feed, raw content) pairs
+            cutoff_time: Skip articles published before this time
+            parse_workers: Number of parser processes (default: CPU count)
 
-        logger.info(f"Collected {len(all_articles)} articles")
+        Returns:
+            Articles from all feeds
+        """
+        workers = min(parse_workers or os.cpu_count() or 1, len(downloaded))
+        if workers > 1:
+            pool = None
+            try:
+                pool = _get_parse_pool(workers)
+                return self._parse_feeds_with(pool, downloaded, cutoff_time)
+            except (OSError, RuntimeError, BrokenProcessPool) as e:
+                # RuntimeError: a concurrent fetch replaced the pool with a larger one
+                logger.warning(f"Process pool unavailable, parsing in-process: {e}")
+                if pool is not None:
+                    _discard_parse_pool(pool)
+
+        all_articles = []
+        for feed, content in downloaded:
+            try:
+                all_articles.extend(parse_feed_articles(content, feed["name"], cutoff_time))
+            except Exception as e:
+                logger.error(f"Error parsing {feed['name']}: {e}")
+        return all_articles
+
+    @staticmethod
+    def _parse_feeds_with(executor, downloaded: List[Tuple[Dict, bytes]], cutoff_time: datetime) -> List[Dict]:
+        """Submit every feed to executor and collect articles (the caller owns executor)."""
+        all_articles = []
+        futures = [
+            (feed, executor.submit(parse_feed_articles, content, feed["name"], cutoff_time))
+            for feed, content in downloaded
+        ]
+        for feed, future in futures:
+            try:
+                all_articles.extend(future.result())
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                logger.error(f"Error parsing {feed['name']}: {e}")
         return all_articles
 
     def _parse_date(self, entry) -> Optional[datetime]:
         """Parse publication date from feed entry."""
-        if hasattr(entry, "published_parsed") and entry.published_parsed:
-            return datetime.fromtimestamp(mktime(entry.published_parsed))
-        elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
-            return datetime.fromtimestamp(mktime(entry.updated_parsed))
-        return None
+        return parse_entry_date(entry)
 
-    def enrich_with_og_images(self, articles: List[Dict], max_workers: int = 3) -> List[Dict]:
+    def enrich_with_og_images(self, articles: List[Dict], max_workers: int = 8) -> List[Dict]:
         """
         Enrich articles that don't have images with og:image from their pages.
 
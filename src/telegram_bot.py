@@ -4,14 +4,12 @@ import asyncio
 import json
 import os
 import re
-from typing import List, Optional
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
 
 import requests
-
-
-def strip_html_tags(text: str) -> str:
-    """Remove HTML tags from text for safe preview truncation."""
-    return re.sub(r'<[^>]+>', '', text)
 from requests.exceptions import ConnectionError as ReqConnectionError
 from requests.exceptions import RequestException, Timeout
 from telegram import (
@@ -37,10 +35,69 @@ from tenacity import (
 )
 
 from logger import get_logger
+from rate_limiter import RateLimiter
 
 logger = get_logger("news_bot.telegram")
 
 
+def strip_html_tags(text: str) -> str:
+    """Remove HTML tags from text for safe preview truncation."""
+    return re.sub(r'<[^>]+>', '', text)
+
+
+# Telegram Bot API limits: ~30 messages/second overall, 20 messages/minute per group/channel
+_global_limiter = RateLimiter(rate=30, per=1.0)
+_chat_limiters: Dict[str, RateLimiter] = {}
+_chat_limiters_lock = threading.Lock()
+
+# Set while a sender call runs via _send_async: its first send slot was already awaited
+_send_prepaid: ContextVar[bool] = ContextVar("send_prepaid", default=False)
+
+
+def _reserve_send(chat_id) -> float:
+    """Reserve one send to chat_id; return seconds to wait before sending."""
+    key = str(chat_id)
+    delay = _global_limiter.reserve()
+    # The per-minute limit is for groups and channels (negative ids or @username);
+    # private chats only share the global limit
+    if key.startswith(("-", "@")):
+        with _chat_limiters_lock:
+            limiter = _chat_limiters.get(key)
+            if limiter is None:
+                limiter = _chat_limiters[key] = RateLimiter(rate=20, per=60.0)
+        delay = max(delay, limiter.reserve())
+    if delay > 0:
+        logger.debug(f"Throttled send to {key} for {delay:.2f}s")
+    return delay
+
+
+def _throttle(chat_id) -> None:
+    """Block until sending one more message to chat_id stays within limits."""
+    if _send_prepaid.get():
+        _send_prepaid.set(False)
+        return
+    delay = _reserve_send(chat_id)
+    if delay > 0:
+        time.sleep(delay)
+
+
+async def _send_async(chat_id, send, *args, **kwargs):
+    """
+    Call a blocking TelegramSender method from async code.
+
+    The first send slot is awaited with asyncio.sleep, and the HTTP calls run
+    in a worker thread, so neither throttling nor the request blocks the event loop.
+    """
+    delay = _reserve_send(chat_id)
+    if delay > 0:
+        await asyncio.sleep(delay)
+    token = _send_prepaid.set(True)
+    try:
+        return await asyncio.to_thread(send, *args, **kwargs)
+    finally:
+        _send_prepaid.reset(token)
+
+
 class TelegramSender:
     """Send messages via Telegram bot using direct HTTP API."""
 
@@ -85,6 +142,8 @@ class TelegramSender:
             API response as dict
         """
         url = f"{self.api_url}/{endpoint}"
+        if "chat_id" in data:
+            _throttle(data["chat_id"])
         response = requests.post(url, data=data, timeout=timeout)
         response.raise_for_status()
         result = response.json()
@@ -224,6 +283,7 @@ class TelegramSender:
             if reply_markup:
                 import json as _json
                 data["reply_markup"] = _json.dumps(reply_markup)
+            _throttle(chat_id)
             response = requests.post(url, data=data, files=files, timeout=60)
             response.raise_for_status()
             result = response.json()
@@ -589,7 +649,8 @@ class TelegramBotHandler:
             mq = get_moderation_queue()
 
             # Fetch and filter articles
-            articles = parser.fetch_recent_news(hours=24)
+            # Fetching/parsing feeds blocks, keep the event loop responsive
+            articles = await asyncio.to_thread(parser.fetch_recent_news)
             if not articles:
                 await update.message.reply_text("❌ Нет статей для обработки.")
                 return
@@ -643,8 +704,10 @@ class TelegramBotHandler:
                     post_ids.append(post_id)
 
                 # Mark articles as sent
-                for post in posts:
-                    db.mark_article_sent(post.article_url, post.article_title)
+                db.mark_articles_sent([
+                    {"link": post.article_url, "title": post.article_title}
+                    for post in posts
+                ])
 
                 await update.message.reply_text(
                     f"✅ Сгенерировано {len(posts)} постов!\n\n"
@@ -706,8 +769,10 @@ class TelegramBotHandler:
                 times = ["10:00"]
                 post_ids = queue.schedule_posts_for_day(post_dicts, times=times)
 
-                for post in posts:
-                    db.mark_article_sent(post.article_url, post.article_title)
+                db.mark_articles_sent([
+                    {"link": post.article_url, "title": post.article_title}
+                    for post in posts
+                ])
 
                 stats = queue.get_stats()
                 await update.message.reply_text(
@@ -848,8 +913,10 @@ class TelegramBotHandler:
             image_path = None
             image_url = post.get("image_url")
 
-            # Step 1: If we have OG/RSS image URL - download it
-            if image_url and image_url.startswith(("http://", "https://")):
+            # Step 1: Use the prefetched local file, or download the OG/RSS image URL
+            if image_url and not image_url.startswith(("http://", "https://")):
+                image_path = image_url
+            elif image_url:
                 try:
                     from og_parser import download_image
                     await update.message.reply_text("📷 Скачиваю картинку...")
@@ -883,12 +950,14 @@ class TelegramBotHandler:
 
             # Send with image if available (HTML for proper formatting)
             if image_path:
-                success = sender.send_photo_to_channel(
+                success = await _send_async(
+                    sender.channel_id, sender.send_photo_to_channel,
                     image_path, post["post_text"], parse_mode="HTML",
                     article_url=article_url or None
                 )
             else:
-                success = sender.send_to_channel(
+                success = await _send_async(
+                    sender.channel_id, sender.send_to_channel,
                     post["post_text"], parse_mode="HTML",
                     article_url=article_url or None
                 )
@@ -917,13 +986,14 @@ class TelegramBotHandler:
         try:
             # Show analytics first
             try:
-                from analytics import Analytics
-                analytics = Analytics()
-                analytics_msg = analytics.format_stats_message(days=7)
+                from analytics import get_analytics
+                # SQLite calls are blocking, keep them off the event loop
+                analytics = await asyncio.to_thread(get_analytics)
+                analytics_msg = await asyncio.to_thread(analytics.format_stats_message, days=7)
                 await update.message.reply_text(analytics_msg, parse_mode="HTML")
 
                 # Show A/B comparison
-                ab_msg = analytics.format_ab_comparison_message(days=30)
+                ab_msg = await asyncio.to_thread(analytics.format_ab_comparison_message, days=30)
                 await update.message.reply_text(ab_msg, parse_mode="HTML")
             except Exception as e:
                 logger.warning(f"Analytics not available: {e}")
@@ -976,7 +1046,8 @@ class TelegramBotHandler:
             db = Database()
 
             # Fetch and filter articles
-            articles = parser.fetch_recent_news(hours=24)
+            # Fetching/parsing feeds blocks, keep the event loop responsive
+            articles = await asyncio.to_thread(parser.fetch_recent_news)
             if not articles:
                 await update.message.reply_text("❌ Нет статей для публикации.")
                 return
@@ -991,12 +1062,11 @@ class TelegramBotHandler:
 
             # Send to channel
             sender = TelegramSender()
-            success = sender.send_to_channel(digest)
+            success = await _send_async(sender.channel_id, sender.send_to_channel, digest)
 
             if success:
                 # Mark articles as sent
-                for article in unsent[:20]:  # Same limit as digest
-                    db.mark_article_sent(article["link"], article["title"])
+                db.mark_articles_sent(unsent[:20])  # Same limit as digest
                 await update.message.reply_text("✅ Дайджест опубликован в канал!")
             else:
                 await update.message.reply_text("❌ Ошибка при публикации в канал.")
@@ -1086,12 +1156,14 @@ class TelegramBotHandler:
             sender = TelegramSender()
             article_url = post.get("article_url", "")
             if image_path:
-                message_id = sender.send_photo_to_channel(
+                message_id = await _send_async(
+                    sender.channel_id, sender.send_photo_to_channel,
                     image_path, post["post_text"], parse_mode="HTML",
                     article_url=article_url or None
                 )
             else:
-                message_id = sender.send_to_channel(
+                message_id = await _send_async(
+                    sender.channel_id, sender.send_to_channel,
                     post["post_text"], parse_mode="HTML",
                     article_url=article_url or None
                 )
@@ -1100,9 +1172,10 @@ class TelegramBotHandler:
                 mq.mark_published(post_id)
                 # Record in analytics
                 try:
-                    from analytics import Analytics
-                    analytics = Analytics()
-                    analytics.record_publication(
+                    from analytics import get_analytics
+                    analytics = await asyncio.to_thread(get_analytics)
+                    await asyncio.to_thread(
+                        analytics.record_publication,
                         post_id=post_id,
                         message_id=message_id,
                         channel_id=sender.channel_id,
@@ -1257,8 +1330,8 @@ class TelegramBotHandler:
             await self.app.updater.start_polling(drop_pending_updates=True)
             logger.info("Bot polling started")
             try:
-                while True:
-                    await asyncio.sleep(1)
+                # Block until cancelled instead of waking up every second
+                await asyncio.Event().wait()
             except (asyncio.CancelledError, KeyboardInterrupt):
                 logger.info("Shutdown signal received")
             finally:
@@ -40,7 +40,8 @@ def test_database(temp_db_path: str):
     
     # Override default path
     db = Database(db_path=temp_db_path)
-    return db
+    yield db
+    db.close()
 
 
 @pytest.fixture
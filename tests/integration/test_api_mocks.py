@@ -113,6 +113,33 @@ class TestClaudeAPIIntegration:
         assert sample_relevant_article["title"] in prompt
         assert sample_relevant_article["source"] in prompt
 
+    def test_digest_descriptions_shrink_with_article_count(self):
+        """Descriptions share one budget, so more articles get shorter ones."""
+        import re
+
+        from ai_processor import SUMMARY_MAX_CHARS, AIProcessor
+
+        processor = AIProcessor(api_key="test-key", use_cache=False)
+        articles = [
+            {
+                "title": f"Article {i}",
+                "source": "Test",
+                "summary": "x" * 1000,
+                "link": f"https://example.com/{i}",
+            }
+            for i in range(20)
+        ]
+
+        lengths = []
+        for count in (5, 15, 20):
+            with patch.object(processor, "_call_claude_api", return_value="digest") as api:
+                processor.create_digest(articles[:count])
+            prompt = api.call_args.args[0]
+            lengths.append(max(len(d) for d in re.findall(r"Описание: (x+)", prompt)))
+
+        assert lengths[0] == SUMMARY_MAX_CHARS
+        assert lengths[0] > lengths[1] > lengths[2]
+
 
 @pytest.mark.integration
 class TestTelegramAPIIntegration:
@@ -187,6 +214,59 @@ class TestTelegramAPIIntegration:
         assert data.get("parse_mode") == "Markdown"
 
 
+@pytest.fixture
+def send_limits():
+    """Fresh Telegram send limiters with a generous global limit."""
+    import telegram_bot
+    from rate_limiter import RateLimiter
+
+    with patch.object(telegram_bot, "_global_limiter", RateLimiter(rate=1000)), \
+            patch.dict(telegram_bot._chat_limiters, clear=True):
+        yield telegram_bot
+
+
+@pytest.mark.integration
+class TestTelegramThrottling:
+    """Tests for proactive Telegram send throttling."""
+
+    def test_private_chat_has_no_per_minute_limit(self, send_limits):
+        """Private chats only share the global limit."""
+        delays = [send_limits._reserve_send(12345678) for _ in range(25)]
+
+        assert max(delays) == 0
+        assert "12345678" not in send_limits._chat_limiters
+
+    def test_channel_has_per_minute_limit(self, send_limits):
+        """The 21st message in a minute to a channel has to wait."""
+        delays = [send_limits._reserve_send("-1001234567890") for _ in range(21)]
+
+        assert max(delays[:20]) == 0
+        assert delays[20] > 0
+
+    def test_async_send_awaits_instead_of_sleeping(
+        self,
+        send_limits,
+        mock_telegram_api,
+        mock_env_vars,
+    ):
+        """From async code the wait is asyncio.sleep, not a blocking time.sleep."""
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        sender = send_limits.TelegramSender()
+        for _ in range(20):
+            send_limits._reserve_send(sender.channel_id)
+
+        with patch.object(send_limits.time, "sleep", side_effect=AssertionError("blocked")), \
+                patch.object(send_limits.asyncio, "sleep", new=AsyncMock()) as async_sleep:
+            asyncio.run(
+                send_limits._send_async(sender.channel_id, sender.send_to_channel, "Test")
+            )
+
+        async_sleep.assert_awaited_once()
+        assert mock_telegram_api.call_count == 1
+
+
 @pytest.mark.integration
 class TestRSSFeedIntegration:
     """Tests for RSS feed integration."""
@@ -236,6 +316,102 @@ class TestRSSFeedIntegration:
                 # Should not raise, just log error
                 # In real implementation, fetch_recent_news catches exceptions
 
+    def test_rss_parser_fetches_feeds_in_parallel(self):
+        """Failed feeds should not drop articles from the other feeds."""
+        from rss_parser import RSSParser
+
+        rss = """<?xml version="1.0"?>
+        <rss version="2.0"><channel><title>Feed</title>
+        <item><title>{title}</title><link>https://test.com/{slug}</link></item>
+        </channel></rss>"""
+
+        def fake_fetch(url, timeout=30):
+            if "broken" in url:
+                raise Exception("Network error")
+            slug = url.rsplit("/", 1)[-1]
+            return rss.format(title=f"Article {slug}", slug=slug).encode()
+
+        parser = RSSParser.__new__(RSSParser)
+        parser.feeds = [
+            {"name": "One", "url": "https://test.com/one", "enabled": True},
+            {"name": "Broken", "url": "https://broken.com/feed", "enabled": True},
+            {"name": "Two", "url": "https://test.com/two", "enabled": True},
+            {"name": "Off", "url": "https://test.com/off", "enabled": False},
+        ]
+
+        with patch.object(RSSParser, "_download_feed", side_effect=fake_fetch):
+            articles = parser.fetch_recent_news(hours=24, parse_workers=2)
+
+        assert sorted(a["source"] for a in articles) == ["One", "Two"]
+
+    def test_rss_parser_reuses_parser_processes(self):
+        """Consecutive fetches share one process pool instead of starting a new one."""
+        import rss_parser
+
+        pools = [rss_parser._get_parse_pool(2), rss_parser._get_parse_pool(2)]
+        assert pools[0] is pools[1]
+
+        rss_parser._discard_parse_pool(pools[0])
+        assert rss_parser._get_parse_pool(2) is not pools[0]
+
+    def test_rss_parser_skips_feed_that_fails_to_parse(self):
+        """A feed whose parse raises should be logged and skipped, not abort the fetch."""
+        from concurrent.futures import ThreadPoolExecutor
+        from datetime import datetime
+
+        import rss_parser
+        from rss_parser import RSSParser
+
+        def fake_parse(content, source, cutoff_time):
+            if source == "Broken":
+                raise ValueError("bad feed")
+            return [{"title": f"Article {source}", "source": source}]
+
+        downloaded = [
+            ({"name": "One"}, b"one"),
+            ({"name": "Broken"}, b"broken"),
+            ({"name": "Two"}, b"two"),
+        ]
+
+        with patch.object(rss_parser, "parse_feed_articles", side_effect=fake_parse), \
+                ThreadPoolExecutor(max_workers=2) as executor:
+            articles = RSSParser._parse_feeds_with(executor, downloaded, datetime.now())
+
+        assert sorted(a["source"] for a in articles) == ["One", "Two"]
+
+    def test_fast_parser_matches_feedparser(self):
+        """lxml extractor should return the same fields feedparser gives."""
+        import feedparser
+        import rss_fast
+        from rss_parser import extract_image_from_entry, parse_entry_date
+
+        rss = b"""<?xml version="1.0"?>
+        <rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+        <channel><title>Feed</title>
+        <item><title>A &amp; B</title><link>https://test.com/a</link>
+        <description>Summary</description>
+        <pubDate>Mon, 12 Oct 2026 10:00:00 +0300</pubDate>
+        <media:content url="https://test.com/a.jpg" medium="image"/></item>
+        </channel></rss>"""
+        atom = b"""<?xml version="1.0"?>
+        <feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title>
+        <entry><title>Atom entry</title><link rel="alternate" href="https://test.com/b"/>
+        <published>2026-10-12T10:00:00Z</published><summary>Text</summary></entry>
+        </feed>"""
+
+        for doc in (rss, atom):
+            expected = [
+                {
+                    "title": e.get("title"),
+                    "link": e.get("link"),
+                    "summary": e.get("summary"),
+                    "published": parse_entry_date(e),
+                    "image_url": extract_image_from_entry(e),
+                }
+                for e in feedparser.parse(doc).entries
+            ]
+            assert rss_fast.parse_feed(doc) == expected
+
 
 @pytest.mark.integration
 class TestDeduplicatorWithDatabase:
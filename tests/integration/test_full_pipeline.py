@@ -382,6 +382,28 @@ class TestQueueToPublishPipeline:
         if pending:
             assert pending["id"] != post_id
 
+    def test_new_posts_without_og_image_get_ai_images_in_one_batch(self):
+        """Daily generation batches AI images for posts that have no OG image."""
+        sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+        import scheduler
+
+        queue = MagicMock()
+        generator = MagicMock()
+        generator.generate_for_posts.return_value = {1: "data/images/post_1.png", 3: None}
+        post_dicts = [
+            {"image_prompt": "robot vacuum"},
+            {"image_url": "https://example.com/og.jpg", "image_prompt": "smart kettle"},
+            {"image_url": None, "image_prompt": "desk lamp"},
+        ]
+
+        with patch("image_generator.get_image_generator", return_value=generator):
+            scheduler.generate_post_images(queue, [1, 2, 3], post_dicts)
+
+        generator.generate_for_posts.assert_called_once_with(
+            [(1, "robot vacuum"), (3, "desk lamp")]
+        )
+        queue.update_image_url.assert_called_once_with(1, "data/images/post_1.png")
+
 
 @pytest.mark.integration
 class TestMonitoringIntegration:
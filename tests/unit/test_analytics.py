@@ -0,0 +1,139 @@
+"""
+Unit tests for Analytics module.
+
+Tests cover:
+- post_stats index set and the query plans that rely on it
+- Cached report results
+- Singleton creation
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+
+@pytest.fixture
+def analytics(test_post_queue, temp_db_path):
+    """Analytics on a temp database that also has post_queue."""
+    from analytics import Analytics
+
+    return Analytics(db_path=temp_db_path)
+
+
+def _plan(db_path: str, sql: str, params=()) -> str:
+    """EXPLAIN QUERY PLAN details joined into one string."""
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+class TestPostStatsIndexes:
+    """Every post_stats index must be used by a query (each one slows stats updates)."""
+
+    def test_index_set(self, analytics, temp_db_path):
+        """Only the indexes the queries below need should exist."""
+        with sqlite3.connect(temp_db_path) as conn:
+            names = {
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'post_stats'"
+                )
+            }
+        assert names == {
+            "sqlite_autoindex_post_stats_1",  # UNIQUE(post_id)
+            "idx_post_stats_message_uniq",
+            "idx_post_stats_published",
+            "idx_ps_published_date",
+        }
+
+    def test_post_stats_uses_post_id_index(self, analytics, temp_db_path):
+        """get_post_stats is a single UNIQUE(post_id) probe."""
+        from analytics import _SELECT_STATS_SQL
+
+        assert "sqlite_autoindex_post_stats_1" in _plan(
+            temp_db_path, _SELECT_STATS_SQL["post_id"], (1,)
+        )
+
+    def test_top_posts_range_uses_published_index(self, analytics, temp_db_path):
+        """get_top_posts filters the period through idx_post_stats_published."""
+        plan = _plan(
+            temp_db_path,
+            "SELECT post_id, views FROM post_stats WHERE published_at > ? ORDER BY views DESC LIMIT 5",
+            ("2026-01-01",),
+        )
+        assert "idx_post_stats_published" in plan
+
+    def test_ab_comparison_uses_published_index(self, analytics, temp_db_path):
+        """A/B aggregation reads the period's rows through idx_post_stats_published."""
+        plan = _plan(
+            temp_db_path,
+            """SELECT ab_group, COUNT(*), SUM(views), SUM(forwards), SUM(reactions)
+            FROM post_stats WHERE ab_group IN ('A', 'B') AND published_at > ?
+            GROUP BY ab_group""",
+            ("2026-01-01",),
+        )
+        assert "idx_post_stats_published (published_at>?)" in plan
+
+    def test_daily_rollup_uses_published_date_index(self, analytics, temp_db_path):
+        """The daily rollup searches one day through idx_ps_published_date."""
+        plan = _plan(
+            temp_db_path,
+            """SELECT COUNT(*), SUM(views), SUM(forwards), SUM(reactions), SUM(comments)
+            FROM post_stats WHERE published_date = ?""",
+            ("2026-01-01",),
+        )
+        assert "idx_ps_published_date (published_date=?)" in plan
+
+
+class TestStatsCache:
+    """Tests for memoized report methods."""
+
+    def test_mutating_result_does_not_corrupt_cache(self, analytics):
+        """Callers get their own copy of a cached result."""
+        first = analytics.get_period_stats(days=7)
+        first["total_views"] = -1
+        first.clear()
+
+        assert analytics.get_period_stats(days=7)["total_views"] == 0
+
+    def test_cached_result_is_reused(self, analytics):
+        """Second call within the TTL doesn't query the database again."""
+        from unittest.mock import patch
+
+        analytics.get_top_posts(days=30)
+        with patch.object(analytics, "_reader", side_effect=AssertionError("queried")):
+            assert analytics.get_top_posts(days=30) == []
+
+
+class TestGetAnalytics:
+    """Tests for the analytics singleton."""
+
+    def test_concurrent_first_calls_share_one_instance(self):
+        """Threads racing on the first call get the same Analytics."""
+        import threading
+        import time
+        from unittest.mock import patch
+
+        import analytics as analytics_module
+
+        def slow_analytics():
+            time.sleep(0.05)
+            return object()
+
+        with patch.object(analytics_module, "_analytics", None), \
+                patch.object(analytics_module, "Analytics", side_effect=slow_analytics) as ctor:
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(analytics_module.get_analytics()))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert ctor.call_count == 1
+        assert len({id(r) for r in results}) == 1
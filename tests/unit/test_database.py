@@ -101,6 +101,24 @@ class TestDatabaseCRUD:
         assert len(unsent) == 2
         assert all(a["link"].endswith(("new1", "new2")) for a in unsent)
 
+    def test_mark_articles_sent_batch(self, test_database):
+        """Batch insert should skip already sent links, not abort."""
+        test_database.mark_article_sent("https://example.com/old", "Old")
+
+        test_database.mark_articles_sent([
+            {"link": "https://example.com/old", "title": "Old again"},
+            {"link": "https://example.com/a", "title": "A", "category": "tool"},
+            {"link": "https://example.com/b", "title": "B", "status": "pending"},
+        ])
+
+        for link in ("old", "a", "b"):
+            assert test_database.is_article_sent(f"https://example.com/{link}")
+
+    def test_mark_articles_sent_empty(self, test_database):
+        """Empty batch should be a no-op."""
+        test_database.mark_articles_sent([])
+        assert test_database.get_recent_titles() == []
+
 
 class TestDatabaseStats:
     """Tests for Database statistics methods."""
@@ -151,6 +169,24 @@ class TestDatabaseCleanup:
         # Should be removed
         assert not test_database.is_article_sent("https://old.com/article")
 
+    def test_cleanup_old_records_in_batches(self, test_database, temp_db_path):
+        """Should remove every old record across several batches, keep recent ones."""
+        import sqlite3
+
+        with sqlite3.connect(temp_db_path) as conn:
+            conn.executemany("""
+                INSERT INTO sent_articles (article_link, title, sent_at)
+                VALUES (?, ?, datetime('now', '-60 days'))
+            """, [(f"https://old.com/{i}", f"Old {i}") for i in range(5)])
+            conn.commit()
+        test_database.mark_article_sent("https://new.com/article", "New Article")
+
+        deleted = test_database.cleanup_old_records(days=30, batch_size=2)
+
+        assert deleted == 5
+        assert not test_database.is_article_sent("https://old.com/4")
+        assert test_database.is_article_sent("https://new.com/article")
+
 
 class TestPostQueueOperations:
     """Tests for PostQueue operations."""
@@ -220,6 +256,17 @@ class TestPostQueueOperations:
         if pending:
             assert pending["id"] != post_id
 
+    def test_pending_counter_tracks_queue(self, test_post_queue):
+        """Cached pending count should follow adds and status changes."""
+        assert test_post_queue.pending == 0
+
+        post_id = test_post_queue.add_post(post_text="Post 1", format_type="ai_tool")
+        test_post_queue.add_post(post_text="Post 2", format_type="ai_tool")
+        assert test_post_queue.pending == 2
+
+        test_post_queue.mark_published(post_id)
+        assert test_post_queue.pending == 1
+
 
 class TestPostQueueScheduling:
     """Tests for PostQueue scheduling features."""
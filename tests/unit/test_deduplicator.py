@@ -173,6 +173,35 @@ class TestFuzzyTitleMatching:
         # Results depend on actual similarity
 
 
+class TestBatchDuplicateCheck:
+    """Tests for check_duplicates_batch."""
+
+    def test_batch_matches_sequential_checks(self):
+        """Batch results should equal per-article check_duplicate calls."""
+        existing = [
+            ("10 AI Tools for Writing", "https://example.com/1"),
+            ("ChatGPT Gets Major Update", "https://example.com/2"),
+        ]
+        articles = [
+            {"title": "ChatGPT Gets a Major Update", "link": "https://example.com/a"},
+            {"title": "Notion AI Adds Meeting Notes", "link": "https://example.com/b"},
+            {"title": "Notion AI Adds Meeting Notes", "link": "https://example.com/c"},
+            {"title": "Something Else Entirely", "link": "https://example.com/2"},
+        ]
+
+        sequential = ContentDeduplicator(similarity_threshold=0.65)
+        batch = ContentDeduplicator(similarity_threshold=0.65)
+        for title, url in existing:
+            sequential.add_existing(title, url)
+            batch.add_existing(title, url)
+
+        expected = [sequential.check_duplicate(a["title"], a["link"], a.get("summary", "")) for a in articles]
+        results = batch.check_duplicates_batch(articles)
+
+        assert results == expected
+        assert [r.is_duplicate for r in results] == [True, False, True, True]
+
+
 class TestNgramGeneration:
     """Tests for n-gram generation."""
 
@@ -250,7 +279,7 @@ class TestJaccardSimilarity:
 
 
 class TestHashDeduplication:
-    """Tests for SHA256 hash-based deduplication."""
+    """Tests for hash-based deduplication."""
 
     def test_compute_hash_deterministic(self, deduplicator):
         """Hash should be deterministic for same input."""
@@ -273,13 +302,13 @@ class TestHashDeduplication:
         
         assert hash1 != hash2
 
-    def test_compute_hash_is_sha256(self, deduplicator):
-        """Hash should be valid SHA256."""
+    def test_compute_hash_is_128_bit_digest(self, deduplicator):
+        """Hash should be a raw 128-bit digest."""
         hash_result = deduplicator.compute_hash("Title", "https://example.com")
         
-        # SHA256 produces 64 character hex string
-        assert len(hash_result) == 64
-        assert all(c in "0123456789abcdef" for c in hash_result)
+        # BLAKE2b with digest_size=16 produces 16 raw bytes
+        assert isinstance(hash_result, bytes)
+        assert len(hash_result) == 16
 
     def test_exact_hash_match_duplicate(self, deduplicator):
         """Exact hash match should be detected."""
@@ -458,6 +487,15 @@ class TestHistoryManagement:
         assert len(deduplicator.seen_urls) == 0
         assert len(deduplicator.seen_hashes) == 0
 
+    def test_add_existing_is_idempotent(self, deduplicator):
+        """Reloading the same history should not duplicate entries."""
+        for _ in range(3):
+            deduplicator.add_existing("Title 1", "https://example.com/1")
+            deduplicator.add_existing("Title 2", "https://example.com/2")
+
+        assert len(deduplicator.seen_titles) == 2
+        assert len(deduplicator.seen_hashes) == 2
+
     def test_get_stats(self, populated_deduplicator):
         """Stats should return correct counts."""
         stats = populated_deduplicator.get_stats()
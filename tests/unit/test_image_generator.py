@@ -0,0 +1,190 @@
+"""
+Unit tests for ImageGenerator module.
+
+Tests cover:
+- Prompt-keyed image cache and named hard links
+- Batched generation (n > 1, only missing variants requested)
+- Rate limiter penalty on 429
+- Image cache cleanup
+"""
+
+import base64
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+
+def _images_response(n: int, payload: bytes = b"png"):
+    """Fake images.generate response with n base64 images."""
+    data = [
+        SimpleNamespace(b64_json=base64.b64encode(payload + str(i).encode()).decode())
+        for i in range(n)
+    ]
+    return SimpleNamespace(data=data)
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    """Temporary images directory used as IMAGES_DIR."""
+    from src import image_generator
+
+    with patch.object(image_generator, "IMAGES_DIR", tmp_path):
+        yield tmp_path
+
+
+@pytest.fixture
+def generator(image_dir):
+    """ImageGenerator with a mocked OpenAI client."""
+    from src import image_generator
+
+    settings = SimpleNamespace(openai_api_key="test-key", openai_image_rpm=600)
+    with patch.object(image_generator, "get_settings", return_value=settings):
+        gen = image_generator.ImageGenerator()
+    gen._client = MagicMock()
+    gen._client.images.generate.side_effect = lambda **kw: _images_response(kw["n"])
+    return gen
+
+
+class TestImageCache:
+    """Tests for the prompt-keyed image cache."""
+
+    def test_same_prompt_is_generated_once(self, generator, image_dir):
+        """Second generate() with the same prompt should not call the API."""
+        first = generator.generate("robot vacuum")
+        second = generator.generate("robot vacuum")
+
+        assert first == second
+        assert Path(first).parent == image_dir
+        assert generator.client.images.generate.call_count == 1
+
+    def test_different_prompts_get_different_files(self, generator):
+        """Cache key depends on the prompt."""
+        assert generator.generate("robot vacuum") != generator.generate("smart kettle")
+        assert generator.client.images.generate.call_count == 2
+
+    def test_named_file_links_to_cached_image(self, generator, image_dir):
+        """generate_for_post returns post_<id>.png pointing at the cached image."""
+        cached = Path(generator.generate("robot vacuum"))
+        path = Path(generator.generate_for_post(7, "robot vacuum"))
+
+        assert path == image_dir / "post_7.png"
+        assert path.read_bytes() == cached.read_bytes()
+        assert os.path.samefile(path, cached)
+        assert generator.client.images.generate.call_count == 1
+
+    def test_named_file_falls_back_to_copy(self, generator, image_dir):
+        """Without hard link support the cached image is copied."""
+        cached = Path(generator.generate("robot vacuum"))
+        with patch("os.link", side_effect=OSError("not supported")):
+            path = Path(generator.generate_for_post(7, "robot vacuum"))
+
+        assert path.read_bytes() == cached.read_bytes()
+        assert not os.path.samefile(path, cached)
+
+
+class TestGenerateMany:
+    """Tests for batched generation."""
+
+    def test_identical_prompts_use_one_request(self, generator):
+        """Identical prompts are one request with n=len(prompts)."""
+        paths = generator.generate_many(["robot vacuum"] * 3)
+
+        assert len(set(paths)) == 3
+        generator.client.images.generate.assert_called_once()
+        assert generator.client.images.generate.call_args.kwargs["n"] == 3
+
+    def test_only_missing_variants_are_requested(self, generator):
+        """Cached variants are reused, only the rest are generated."""
+        first = generator.generate_many(["robot vacuum"] * 2)
+        paths = generator.generate_many(["robot vacuum"] * 3)
+
+        assert paths[:2] == first
+        calls = generator.client.images.generate.call_args_list
+        assert [c.kwargs["n"] for c in calls] == [2, 1]
+
+    def test_failed_prompt_returns_none(self, generator):
+        """A failing prompt gives None, the others still come back."""
+        def fake_generate(**kw):
+            if "broken" in kw["prompt"]:
+                raise RuntimeError("boom")
+            return _images_response(kw["n"])
+
+        generator.client.images.generate.side_effect = fake_generate
+        with patch("time.sleep"):  # tenacity backoff
+            paths = generator.generate_many(["robot vacuum", "broken"])
+
+        assert paths[0] is not None
+        assert paths[1] is None
+
+
+class TestRateLimit:
+    """Tests for proactive throttling."""
+
+    def test_rate_limit_error_penalizes_limiter(self, generator):
+        """A 429 should hold the limiter back before tenacity retries."""
+        from openai import RateLimitError
+
+        error = RateLimitError(
+            "rate limited", response=MagicMock(status_code=429), body=None
+        )
+        generator.client.images.generate.side_effect = [error, _images_response(1)]
+        generator._limiter = MagicMock()
+        generator._limiter.acquire.return_value = 0.0
+
+        with patch("time.sleep"):  # tenacity backoff
+            assert generator.generate("robot vacuum") is not None
+
+        generator._limiter.penalize.assert_called_once()
+        assert generator._limiter.acquire.call_count == 2
+
+    def test_limiter_takes_one_token_per_image(self, generator):
+        """An n-image request consumes n tokens."""
+        generator._limiter = MagicMock()
+        generator._limiter.acquire.return_value = 0.0
+
+        generator.generate_many(["robot vacuum"] * 3)
+
+        assert generator._limiter.acquire.call_count == 3
+
+
+class TestCleanup:
+    """Tests for image cache cleanup."""
+
+    def test_removes_only_old_cache_images(self, image_dir):
+        """Old img_*.png are removed; fresh ones and post files stay."""
+        from src.image_generator import cleanup_image_cache
+
+        old = image_dir / "img_old.png"
+        fresh = image_dir / "img_fresh.png"
+        post = image_dir / "post_1.png"
+        for path in (old, fresh, post):
+            path.write_bytes(b"png")
+        month_ago = time.time() - 40 * 86400
+        for path in (old, post):
+            os.utime(path, (month_ago, month_ago))
+
+        assert cleanup_image_cache(days=30) == 1
+        assert not old.exists()
+        assert fresh.exists() and post.exists()
+
+    def test_cache_hit_keeps_image_fresh(self, generator, image_dir):
+        """Using a cached image resets its age."""
+        from src.image_generator import cleanup_image_cache
+
+        cached = Path(generator.generate("robot vacuum"))
+        month_ago = time.time() - 40 * 86400
+        os.utime(cached, (month_ago, month_ago))
+
+        generator.generate("robot vacuum")
+
+        assert cleanup_image_cache(days=30) == 0
+        assert cached.exists()